@@ -18,12 +18,22 @@ class TrackingConfig:
     """
     跟踪算法的运行时参数
     """
+    # 以下 ArUco / cornerSubPix 参数为旧版检测器保留（配置文件仍会写入）；
+    # 当前红色标记跟踪器以轮廓矩直接得到亚像素质心，不再有单独的角点细化步骤
     marker_id: int = 42
     marker_dict: int = 0 # cv2.aruco.DICT_4X4_50 (example mapping)
     subpix_win_size: int = 11
     subpix_zero_zone: int = -1
     subpix_criteria_max_iter: int = 30
     subpix_criteria_eps: float = 0.001
+    detect_pyr_levels: int = 0  # 粗定位前的 pyrDown 次数（0 表示直接在原图上检测；降采样后的形态学可能滤掉小标记）
+    # 使用 Numba 融合内核检测红色标记（需安装 numba）。该路径不做形态学与轮廓筛选，矩取自窗口内全部红色像素：
+    # 画面中有多个红色区域时会把它们合并成一个质心，而不是像 OpenCV 路径那样只取最大轮廓，只适用于画面中仅有一个红色标记的场景
+    use_numba: bool = False
+    use_cuda: bool = False  # 使用 OpenCV CUDA 模块做颜色分割与形态学（需 CUDA 版 OpenCV 及 GPU）
+    local_tracking: bool = False  # 上一帧检测成功时，先用光流预测位置做局部检测（只取上一帧附近的轮廓，画面中出现更大的红色区域时结果与全图最大轮廓不同）
+    track_search_margin: int = 32  # 局部跟踪的光流搜索半径 (像素)
+    roi_radius: int = 64  # Numba 路径局部检测窗口的半宽 (像素，以上一帧质心为中心)
 
 @dataclass
 class DisplacementSeries:
@@ -1,4 +1,7 @@
+import math
 import numpy as np
+from functools import lru_cache
+from typing import Optional
 import sys
 import os
 
@@ -7,6 +10,19 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from data_structs.analysis_data import CalibrationData, DisplacementSeries
 
+@lru_cache(maxsize=32)
+def _rot_matrix(angle_deg: float, ratio: float = 1.0) -> np.ndarray:
+    """
+    按 (角度, 比例尺) 缓存的 2x2 旋转矩阵（已乘以比例尺），批量/分段调用时不再重复计算三角函数。
+    返回只读数组，调用方不得原地修改。
+    """
+    theta = math.radians(angle_deg)
+    c = math.cos(theta)
+    s = math.sin(theta)
+    R = np.array([[c, s], [-s, c]], dtype=np.float64) * ratio
+    R.setflags(write=False)
+    return R
+
 def pixel_to_physical(dx_pix: np.ndarray, dy_pix: np.ndarray, calib: CalibrationData) -> np.ndarray:
     """
     利用比例尺将像素位移转换为物理位移 (mm)
@@ -28,18 +44,15 @@ def decompose_vibration(dx_mm: np.ndarray, dy_mm: np.ndarray, angle_deg: float)
     应用旋转矩阵将物理位移投影分解到切向 (Flapwise) 和轴向 (Edgewise)
     返回: (d_flapwise, d_edgewise)
     """
-    # 将角度转换为弧度
-    theta = np.radians(angle_deg)
-    
     # 构造旋转矩阵
     # 假设 angle_deg 是叶片主轴相对于图像垂直方向的夹角
     # 我们需要将图像坐标系 (x, y) 旋转到叶片坐标系 (flap, edge)
     # 这里采用标准的 2D 旋转矩阵
     # [ x' ]   [ cos(theta)   sin(theta) ] [ x ]
     # [ y' ] = [ -sin(theta)  cos(theta) ] [ y ]
-    
-    c = np.cos(theta)
-    s = np.sin(theta)
+    R = _rot_matrix(float(angle_deg))
+    c = R[0, 0]
+    s = R[0, 1]
     
     # 批量旋转
     # d_flapwise 对应 x' (假设切向对应旋转后的 X 轴，或者根据具体定义调整)
@@ -49,3 +62,20 @@ def decompose_vibration(dx_mm: np.ndarray, dy_mm: np.ndarray, angle_deg: float)
     d_edgewise = -dx_mm * s + dy_mm * c
     
     return d_flapwise, d_edgewise
+
+def pixel_to_flap_edge(dx_pix: np.ndarray, dy_pix: np.ndarray, calib: CalibrationData, angle_deg: Optional[float] = None) -> np.ndarray:
+    """
+    融合 pixel_to_physical 与 decompose_vibration：把比例尺并入旋转矩阵，
+    用一次 2x2 @ 2xN 矩阵乘法直接得到切向/轴向物理位移 (mm)。
+    返回: (d_flapwise, d_edgewise)
+    """
+    if angle_deg is None:
+        angle_deg = calib.leaf_angle_deg
+    
+    # 与 decompose_vibration 相同的旋转矩阵，预先乘以 mm/pixel 比例尺
+    R = _rot_matrix(float(angle_deg), float(calib.pixel_to_mm_ratio))
+    
+    xy = np.vstack([dx_pix, dy_pix])
+    d_flapwise, d_edgewise = R @ xy
+    
+    return d_flapwise, d_edgewise
@@ -1,6 +1,11 @@
 import cv2
+import math
 import numpy as np
-from typing import Tuple, List, Optional
+import queue
+import threading
+from dataclasses import astuple
+from functools import lru_cache
+from typing import Iterable, Tuple, List, Optional
 import sys
 import os
 
@@ -9,6 +14,79 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from data_structs.analysis_data import TrackingConfig
 
+# joblib 为可选依赖：缺失时退化为单进程逐帧跟踪
+try:
+    from joblib import Parallel, delayed, effective_n_jobs
+    JOBLIB_AVAILABLE = True
+except ImportError:
+    JOBLIB_AVAILABLE = False
+
+# 并行跟踪的分段长度（帧）：分段边界只取决于帧序号，与工作进程数、机器核数无关
+TRACK_CHUNK_FRAMES = 256
+# 帧数少于该值时直接在当前进程跟踪，短片段不值得启动进程池
+PARALLEL_MIN_FRAMES = 4 * TRACK_CHUNK_FRAMES
+
+# numba 为可选依赖：缺失时 use_numba 配置被忽略，始终走 OpenCV 路径
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+def _cuda_available() -> bool:
+    """
+    当前 OpenCV 是否为 CUDA 构建且存在可用 GPU（pip 版 opencv-python 恒为 False）。
+    """
+    try:
+        return hasattr(cv2, "cuda") and cv2.cuda.getCudaEnabledDeviceCount() > 0
+    except cv2.error:
+        return False
+
+if NUMBA_AVAILABLE:
+    @njit(parallel=True, cache=True)
+    def _red_centroid_bgr(img):
+        """
+        单次遍历 BGR 图像：逐像素按 OpenCV 8 位 HSV 规则换算，
+        统计落在两个红色范围内的像素数 m00 及一阶矩 m10、m01（各行并行归约）。
+        返回 (m00, m10, m01, n_edge)，n_edge 为位于图像四条边上的红色像素数（用于判断 ROI 是否截断了标记）。
+        """
+        H, W = img.shape[0], img.shape[1]
+        m00 = 0.0
+        m10 = 0.0
+        m01 = 0.0
+        n_edge = 0
+        for i in prange(H):
+            for j in range(W):
+                b = np.int32(img[i, j, 0])
+                g = np.int32(img[i, j, 1])
+                r = np.int32(img[i, j, 2])
+                v = max(r, g, b)
+                if v < 100:
+                    continue
+                diff = v - min(r, g, b)
+                # 与 cv2.COLOR_BGR2HSV 相同的 12 位定点除法表，保证 S/H 取整结果逐像素一致
+                sdiv = int(round((255 << 12) / v))
+                if (diff * sdiv + 2048) >> 12 < 100:
+                    continue
+                # H ∈ [0, 180)
+                if v == r:
+                    hh = g - b
+                elif v == g:
+                    hh = b - r + 2 * diff
+                else:
+                    hh = r - g + 4 * diff
+                hdiv = int(round((180 << 12) / (6.0 * diff)))
+                h = (hh * hdiv + 2048) >> 12
+                if h < 0:
+                    h += 180
+                if h <= 10 or h >= 160:
+                    m00 += 1.0
+                    m10 += j
+                    m01 += i
+                    if i == 0 or i == H - 1 or j == 0 or j == W - 1:
+                        n_edge += 1
+        return m00, m10, m01, n_edge
+
 class MarkerTracker:
     def __init__(self, config: TrackingConfig):
         self.config = config
@@ -19,90 +97,458 @@ class MarkerTracker:
         self.red_lower2 = np.array([160, 100, 100])
         self.red_upper2 = np.array([180, 255, 255])
         
-        # 记录上一帧的位置，用于局部搜索（可选优化）
-        self.last_pos = None
+        # 形态学结构元素只需构建一次，避免逐帧重复分配
+        self._kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (5, 5))
+        
+        # HSV 图像与掩膜的复用缓冲区（按用途命名，尺寸变化时才重新分配）
+        self._scratch = {}
+        
+        # 可选：用 Numba 融合内核一次遍历完成颜色分割与质心计算（跳过形态学与轮廓）
+        self.use_numba = bool(config.use_numba) and NUMBA_AVAILABLE
+        
+        # 可选：在 GPU 上完成 cvtColor/inRange/形态学（轮廓与矩仍在 CPU 上计算）
+        self.use_cuda = bool(config.use_cuda) and _cuda_available()
+        if self.use_cuda:
+            self._init_gpu()
+        
+        # 后端在构建时确定，逐帧直接调用绑定好的实现，热路径中不再分支判断
+        self._red_mask = self._red_mask_gpu if self.use_cuda else self._red_mask_cpu
+        
+        # 跨帧状态：上一帧的检测框 (x, y, w, h) 与图像，用于局部跟踪
+        self._last_bbox = None
+        self._prev_frame = None
+        # Numba 路径：上一帧的质心，用于在其周围的小窗口内检测
+        self._last_center = None
 
-    def track_marker_subpix(self, frame: np.ndarray) -> Tuple[float, float]:
+    def _init_gpu(self):
         """
-        通过颜色分割定位红色条形标记，并返回亚像素质心坐标 (x, y)。
+        构建 GPU 端的形态学滤波器与 CUDA 流；GpuMat 缓冲区按尺寸惰性分配。
         """
-        if frame is None:
-            return np.nan, np.nan
+        self._stream = cv2.cuda.Stream()
+        self._gpu_open = cv2.cuda.createMorphologyFilter(cv2.MORPH_OPEN, cv2.CV_8UC1, self._kernel)
+        self._gpu_close = cv2.cuda.createMorphologyFilter(cv2.MORPH_CLOSE, cv2.CV_8UC1, self._kernel)
+        self._gpu_scratch = {}
+        # cuda.inRange 需要标量元组，阈值只转换一次
+        self._gpu_bounds = [
+            (tuple(int(v) for v in lo), tuple(int(v) for v in hi))
+            for lo, hi in ((self.red_lower1, self.red_upper1), (self.red_lower2, self.red_upper2))
+        ]
+
+    def _gpu_buffer(self, name: str, shape: Tuple[int, int], mat_type: int):
+        """
+        取出名为 name 的 GpuMat 复用缓冲区；尺寸变化时重新分配。
+        """
+        buf = self._gpu_scratch.get(name)
+        if buf is None or buf.size() != (shape[1], shape[0]):
+            buf = cv2.cuda_GpuMat(shape[0], shape[1], mat_type)
+            self._gpu_scratch[name] = buf
+        return buf
+
+    def _red_mask_gpu(self, bgr: np.ndarray, tag: str) -> np.ndarray:
+        """
+        与 _red_mask_cpu 相同的分割流程，在 GPU 上执行，只把最终的单通道掩膜下载回主机。
+        """
+        h, w = bgr.shape[:2]
+        stream = self._stream
+
+        gpu_bgr = self._gpu_buffer(tag + "_bgr", (h, w), cv2.CV_8UC3)
+        gpu_bgr.upload(np.ascontiguousarray(bgr), stream)
+
+        gpu_hsv = cv2.cuda.cvtColor(gpu_bgr, cv2.COLOR_BGR2HSV, dst=self._gpu_buffer(tag + "_hsv", (h, w), cv2.CV_8UC3), stream=stream)
+        mask1 = cv2.cuda.inRange(gpu_hsv, *self._gpu_bounds[0],
+                                 dst=self._gpu_buffer(tag + "_mask1", (h, w), cv2.CV_8UC1), stream=stream)
+        mask2 = cv2.cuda.inRange(gpu_hsv, *self._gpu_bounds[1],
+                                 dst=self._gpu_buffer(tag + "_mask2", (h, w), cv2.CV_8UC1), stream=stream)
+        mask = cv2.cuda.bitwise_or(mask1, mask2, dst=mask1, stream=stream)
+        mask = self._gpu_open.apply(mask, dst=mask2, stream=stream)
+        mask = self._gpu_close.apply(mask, dst=mask1, stream=stream)
+
+        out = mask.download(stream=stream, dst=self._buffer(tag + "_mask_host", (h, w)))
+        stream.waitForCompletion()
+        return out
+
+    def _buffer(self, name: str, shape: Tuple[int, ...]) -> np.ndarray:
+        """
+        取出名为 name 的 uint8 复用缓冲区；尺寸与 shape 不符时重新分配。
+        """
+        buf = self._scratch.get(name)
+        if buf is None or buf.shape != shape:
+            buf = np.empty(shape, dtype=np.uint8)
+            self._scratch[name] = buf
+        return buf
+
+    def _red_mask_cpu(self, bgr: np.ndarray, tag: str = "full") -> np.ndarray:
+        """
+        HSV 颜色分割 + 形态学处理，得到红色区域的二值掩膜。
+        中间结果写入按 tag 区分的复用缓冲区；返回的掩膜在下一次同 tag 调用前有效。
+        """
+        h, w = bgr.shape[:2]
 
         # 1. 转换到 HSV 空间
-        hsv = cv2.cvtColor(frame, cv2.COLOR_BGR2HSV)
+        hsv = cv2.cvtColor(bgr, cv2.COLOR_BGR2HSV, dst=self._buffer(tag + "_hsv", (h, w, 3)))
 
         # 2. 创建红色掩膜（处理红色跨越 0/180 的情况）
-        mask1 = cv2.inRange(hsv, self.red_lower1, self.red_upper1)
-        mask2 = cv2.inRange(hsv, self.red_lower2, self.red_upper2)
-        mask = cv2.addWeighted(mask1, 1.0, mask2, 1.0, 0.0)
+        mask1 = cv2.inRange(hsv, self.red_lower1, self.red_upper1, dst=self._buffer(tag + "_mask1", (h, w)))
+        mask2 = cv2.inRange(hsv, self.red_lower2, self.red_upper2, dst=self._buffer(tag + "_mask2", (h, w)))
+        # 两个掩膜均为 0/255，按位或即可合并
+        mask = cv2.bitwise_or(mask1, mask2, dst=mask1)
 
         # 3. 形态学处理：去除噪声并填充空洞
-        kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (5, 5))
-        mask = cv2.morphologyEx(mask, cv2.MORPH_OPEN, kernel)
-        mask = cv2.morphologyEx(mask, cv2.MORPH_CLOSE, kernel)
+        mask = cv2.morphologyEx(mask, cv2.MORPH_OPEN, self._kernel, dst=mask2)
+        mask = cv2.morphologyEx(mask, cv2.MORPH_CLOSE, self._kernel, dst=mask1)
+        return mask
 
+    @staticmethod
+    def _largest_contour(mask: np.ndarray, min_area: float) -> Optional[np.ndarray]:
+        """
+        返回面积最大的外轮廓；没有轮廓或面积小于 min_area 时返回 None。
+        """
         # 4. 寻找轮廓
         contours, _ = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
         
         if not contours:
-            return np.nan, np.nan
+            return None
 
-        # 5. 找到面积最大的轮廓（假设它是我们的红色条形标记）
-        max_cnt = max(contours, key=cv2.contourArea)
+        # 5. 找到面积最大的轮廓（假设它是我们的红色条形标记），每个轮廓的面积只计算一次
+        # 形态学去噪后通常只剩一个轮廓，此时无需比较
+        if len(contours) == 1:
+            max_cnt = contours[0]
+            max_area = cv2.contourArea(max_cnt)
+        else:
+            areas = np.fromiter((cv2.contourArea(cnt) for cnt in contours), dtype=np.float64, count=len(contours))
+            k = int(np.argmax(areas))
+            max_cnt = contours[k]
+            max_area = areas[k]
         
         # 过滤掉太小的噪声
-        if cv2.contourArea(max_cnt) < 50:
-            return np.nan, np.nan
+        if max_area < min_area:
+            return None
+        return max_cnt
 
-        # 6. 计算质心（利用矩 Moments 获得亚像素精度）
+    def reset(self):
+        """
+        清除跨帧状态（上一帧的检测框与图像），下一帧将重新做全图检测。
+        """
+        self._last_bbox = None
+        self._prev_frame = None
+        self._last_center = None
+
+    def _track_numba(self, frame: np.ndarray, min_area: float) -> Tuple[float, float, float]:
+        """
+        Numba 融合内核路径：上一帧检测成功时，先只在上一质心 ± roi_radius 的窗口内统计红色像素；
+        未检测到或标记触及窗口边界时，回退到整帧统计。
+        """
+        if self.config.local_tracking and self._last_center is not None:
+            h, w = frame.shape[:2]
+            R = self.config.roi_radius
+            cx, cy = self._last_center
+            x0, y0 = max(0, int(cx) - R), max(0, int(cy) - R)
+            x1, y1 = min(w, int(cx) + R), min(h, int(cy) + R)
+            if x1 > x0 and y1 > y0:
+                m00, m10, m01, n_edge = _red_centroid_bgr(np.ascontiguousarray(frame[y0:y1, x0:x1]))
+                if m00 > min_area and n_edge == 0:
+                    m10 += x0 * m00
+                    m01 += y0 * m00
+                    self._last_center = (m10 / m00, m01 / m00)
+                    return float(m00), float(m10), float(m01)
+
+        # 无形态学去噪，改用像素面积阈值过滤噪声
+        m00, m10, m01, _ = _red_centroid_bgr(np.ascontiguousarray(frame))
+        if m00 <= min_area:
+            self._last_center = None
+            return np.nan, np.nan, np.nan
+        self._last_center = (m10 / m00, m01 / m00)
+        return float(m00), float(m10), float(m01)
+
+    def _measure_roi(self, frame: np.ndarray, x0: int, y0: int, x1: int, y1: int, min_area: float,
+                     edge_guard: bool = False) -> Optional[Tuple[float, float, float, Tuple[int, int, int, int]]]:
+        """
+        在原分辨率 ROI [y0:y1, x0:x1] 内分割红色区域并计算标记轮廓的矩。
+        返回 (m00, m10, m01, bbox)，一阶矩与 bbox 均已换算回整帧坐标；失败返回 None。
+        edge_guard=True 时，若标记贴到了 ROI 的内部边界（可能被截断）也视为失败。
+        """
+        roi = frame[y0:y1, x0:x1]
+        if roi.size == 0:
+            return None
+
+        max_cnt = self._largest_contour(self._red_mask(roi, "fine"), min_area)
+        if max_cnt is None:
+            return None
+
+        bx, by, bw, bh = cv2.boundingRect(max_cnt)
+        if edge_guard:
+            h, w = frame.shape[:2]
+            guard = 3
+            if (x0 > 0 and bx < guard) or (y0 > 0 and by < guard) or \
+               (x1 < w and bx + bw > roi.shape[1] - guard) or (y1 < h and by + bh > roi.shape[0] - guard):
+                return None
+
+        # 6. 计算矩（质心 m10/m00, m01/m00 具有亚像素精度），一阶矩平移到整帧坐标
         M = cv2.moments(max_cnt)
-        if M["m00"] == 0:
-            return np.nan, np.nan
+        m00 = M["m00"]
+        if m00 == 0:
+            return None
             
-        center_x = M["m10"] / M["m00"]
-        center_y = M["m01"] / M["m00"]
+        m10 = M["m10"] + x0 * m00
+        m01 = M["m01"] + y0 * m00
+        if not (math.isfinite(m10) and math.isfinite(m01)):
+            return None
+
+        return float(m00), float(m10), float(m01), (bx + x0, by + y0, bw, bh)
+
+    def _detect_full(self, frame: np.ndarray, min_area: float) -> Optional[Tuple[float, float, float, Tuple[int, int, int, int]]]:
+        """
+        全图检测：可选的金字塔粗定位 + 原分辨率 ROI 精确质心。
+        """
+        h, w = frame.shape[:2]
+
+        levels = self.config.detect_pyr_levels
+        if levels <= 0:
+            return self._measure_roi(frame, 0, 0, w, h, min_area)
+
+        small = frame
+        for _ in range(levels):
+            small = cv2.pyrDown(small)
+        scale = 2 ** levels
+
+        coarse_cnt = self._largest_contour(self._red_mask(small, "coarse"), min_area / (scale * scale))
+        if coarse_cnt is None:
+            return None
+
+        # 将粗定位的包围盒映射回原图并留出余量：
+        # 取整误差与 pyrDown 的 5 抽头高斯模糊（每层半径 2）约 6*scale 像素，
+        # 再加上原图上开运算 + 闭运算（共四次腐蚀/膨胀）的影响范围，
+        # 保证 ROI 边界不参与标记附近的形态学结果，质心与 levels=0 一致
+        bx, by, bw, bh = cv2.boundingRect(coarse_cnt)
+        margin = 6 * scale + 4 * (self._kernel.shape[0] // 2)
+        x0 = max(0, bx * scale - margin)
+        y0 = max(0, by * scale - margin)
+        x1 = min(w, (bx + bw) * scale + margin)
+        y1 = min(h, (by + bh) * scale + margin)
+        return self._measure_roi(frame, x0, y0, x1, y1, min_area)
+
+    def _track_local(self, frame: np.ndarray, min_area: float) -> Optional[Tuple[float, float, float, Tuple[int, int, int, int]]]:
+        """
+        上一帧已检测到标记时的快速路径：在上一帧检测框周围的小窗口内，
+        用金字塔 LK 光流估计标记的帧间位移，再只在预测位置的 ROI 内计算质心。
+        """
+        prev = self._prev_frame
+        if prev is None or prev.shape != frame.shape:
+            return None
+
+        h, w = frame.shape[:2]
+        bx, by, bw, bh = self._last_bbox
+        m = self.config.track_search_margin
+
+        # 1. 光流窗口：上一帧检测框外扩搜索半径，两帧取同一窗口
+        wx0, wy0 = max(0, bx - m), max(0, by - m)
+        wx1, wy1 = min(w, bx + bw + m), min(h, by + bh + m)
+        g0 = cv2.cvtColor(prev[wy0:wy1, wx0:wx1], cv2.COLOR_BGR2GRAY)
+        g1 = cv2.cvtColor(frame[wy0:wy1, wx0:wx1], cv2.COLOR_BGR2GRAY)
+
+        # 以检测框四角与中心作为跟踪点（窗口内坐标）
+        pts = np.array([[bx, by], [bx + bw, by], [bx, by + bh], [bx + bw, by + bh],
+                        [bx + 0.5 * bw, by + 0.5 * bh]], dtype=np.float32)
+        pts -= (wx0, wy0)
+        nxt, status, _ = cv2.calcOpticalFlowPyrLK(g0, g1, pts.reshape(-1, 1, 2), None,
+                                                  winSize=(21, 21), maxLevel=2)
+        ok = status.reshape(-1).astype(bool)
+        if ok.any():
+            shift = np.median(nxt.reshape(-1, 2)[ok] - pts[ok], axis=0)
+            sx, sy = int(round(float(shift[0]))), int(round(float(shift[1])))
+        else:
+            sx, sy = 0, 0
+
+        # 2. 在预测位置的检测框周围计算质心；标记贴边（可能被截断）时交回全图检测
+        pad = 8
+        x0 = max(0, bx + sx - pad)
+        y0 = max(0, by + sy - pad)
+        x1 = min(w, bx + sx + bw + pad)
+        y1 = min(h, by + sy + bh + pad)
+        return self._measure_roi(frame, x0, y0, x1, y1, min_area, edge_guard=True)
+
+    def track_marker_moments(self, frame: np.ndarray) -> Tuple[float, float, float]:
+        """
+        定位红色条形标记并返回其整帧坐标下的矩 (m00, m10, m01)；丢失时全为 NaN。
+        质心为 (m10 / m00, m01 / m00)，批量跟踪时由调用方对整段结果统一做向量化除法。
+
+        若 config.detect_pyr_levels > 0，先在金字塔降采样图像上粗定位标记，
+        再只在原分辨率的对应 ROI 内重新分割并计算矩，精度仍由原图决定。
+        若 config.local_tracking 开启且上一帧检测成功，则先用光流预测位置做局部检测，
+        失败时再回退到全图检测。
+        """
+        # 防御性检查：非 HxWx3 的帧会让 cvtColor 抛出 cv2.error 并中断整批跟踪，这里直接视为丢失
+        if frame is None or frame.ndim != 3 or frame.shape[2] != 3 or frame.size == 0:
+            self.reset()
+            return np.nan, np.nan, np.nan
+
+        min_area = 50
+
+        if self.use_numba:
+            return self._track_numba(frame, min_area)
+
+        result = None
+        if self.config.local_tracking and self._last_bbox is not None:
+            result = self._track_local(frame, min_area)
+        if result is None:
+            result = self._detect_full(frame, min_area)
+
+        if result is None:
+            self.reset()
+            return np.nan, np.nan, np.nan
+
+        m00, m10, m01, self._last_bbox = result
+        self._prev_frame = frame
+        return m00, m10, m01
 
-        return float(center_x), float(center_y)
+    def track_marker_subpix(self, frame: np.ndarray) -> Tuple[float, float]:
+        """
+        通过颜色分割定位红色条形标记，并返回亚像素质心坐标 (x, y)；丢失时返回 (NaN, NaN)。
+        """
+        m00, m10, m01 = self.track_marker_moments(frame)
+        if not m00 > 0:
+            return np.nan, np.nan
+        return m10 / m00, m01 / m00
 
-def generate_pixel_series(frame_list: List[np.ndarray], config: TrackingConfig) -> Tuple[np.ndarray, np.ndarray]:
+@lru_cache(maxsize=8)
+def _get_tracker(config_key: tuple) -> MarkerTracker:
     """
-    接收预处理后的帧列表，逐帧调用 track_marker_subpix，返回像素位移序列。
+    按配置缓存跟踪器实例：每个 loky 工作进程首次调用时构建一次，之后复用。
+    仅供并行路径的工作进程使用；调用方进程内的跟踪各自新建实例，并发的 run_image_analysis 不共享跨帧状态与缓冲区。
+    TrackingConfig 不可哈希，因此以 astuple(config) 作为缓存键。
+    """
+    return MarkerTracker(TrackingConfig(*config_key))
+
+def _track_chunk(frames: List[np.ndarray], config: TrackingConfig,
+                 tracker: Optional[MarkerTracker] = None) -> np.ndarray:
+    """
+    跟踪一段连续帧（顶层函数，便于被 joblib 序列化分发到工作进程）。
+    跟踪器带有跨帧状态，因此按连续分段分发，并在每段开始时重置状态。
+    :param tracker: 使用的跟踪器；为 None 时（工作进程中）取 _get_tracker 缓存的实例
+    :return: (3, k) 矩缓冲区（行依次为 m00, m10, m01）
+    """
+    if tracker is None:
+        tracker = _get_tracker(astuple(config))
+    tracker.reset()
+    out = np.full((3, len(frames)), np.nan, dtype=np.float64)
+    for i, frame in enumerate(frames):
+        out[:, i] = tracker.track_marker_moments(frame)
+    return out
+
+def generate_pixel_series(frame_list: List[np.ndarray], config: TrackingConfig, n_jobs: int = -1) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    接收预处理后的帧列表，逐帧跟踪标记，返回像素位移序列。
+
+    在 joblib 可用、n_jobs 解析后多于 1 个进程且帧数不少于 PARALLEL_MIN_FRAMES 时，
+    把帧序列按固定的 TRACK_CHUNK_FRAMES 切成连续分段以多进程并行跟踪
+    （段内保留局部跟踪的跨帧状态）；基准位置 (x0, y0) 的扣除在结果收集后统一完成。
+    n_jobs 的含义与 joblib 相同（-1 为全部核，-2 为留出一个核，依此类推）。
+    """
+    total_frames = len(frame_list)
+
+    # 预分配 (3, N) 矩缓冲区：行依次为 m00, m10, m01，丢失跟踪的帧保持 NaN
+    moments = np.full((3, total_frames), np.nan, dtype=np.float64)
+
+    workers = effective_n_jobs(n_jobs) if JOBLIB_AVAILABLE else 1
+    if workers > 1 and total_frames >= PARALLEL_MIN_FRAMES:
+        starts = range(0, total_frames, TRACK_CHUNK_FRAMES)
+        results = Parallel(n_jobs=workers, backend="loky")(
+            delayed(_track_chunk)(frame_list[s:s + TRACK_CHUNK_FRAMES], config) for s in starts
+        )
+        moments[:] = np.concatenate(results, axis=1)
+    else:
+        # 与并行路径相同的分段及段首状态重置，结果与 n_jobs、进程数无关；
+        # 跟踪器为本次调用独有，不使用进程级缓存
+        tracker = MarkerTracker(config)
+        for s in range(0, total_frames, TRACK_CHUNK_FRAMES):
+            moments[:, s:s + TRACK_CHUNK_FRAMES] = _track_chunk(frame_list[s:s + TRACK_CHUNK_FRAMES], config, tracker)
+
+    return _to_relative_series(_moments_to_coords(moments))
+
+def generate_pixel_series_stream(frame_iter: Iterable[np.ndarray], total_frames: int, config: TrackingConfig, prefetch: int = 8) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    流水线版本的 generate_pixel_series：读取线程逐帧取出/解码 → 主线程跟踪 → 收集线程写入预分配数组。
+    各阶段之间通过有界队列连接，使帧的读取与 OpenCV 计算重叠，且不需要先把全部帧物化为列表。
+
+    :param frame_iter: 逐帧产出图像的可迭代对象（可以是惰性生成器）
+    :param total_frames: 帧总数，用于预分配输出数组
+    :param prefetch: 队列容量（预读帧数）
     """
     tracker = MarkerTracker(config)
-    
-    x_list = []
-    y_list = []
-    
-    # 初始位置 (用于计算相对位移，或者直接返回绝对坐标由后续处理)
+    moments = np.full((3, total_frames), np.nan, dtype=np.float64)
+
+    read_q: "queue.Queue" = queue.Queue(maxsize=prefetch)
+    out_q: "queue.Queue" = queue.Queue(maxsize=prefetch)
+    reader_error: List[BaseException] = []
+
+    def _reader():
+        try:
+            for i, frame in enumerate(frame_iter):
+                if i >= total_frames:
+                    break
+                read_q.put((i, frame))
+        except BaseException as e:  # 读取线程中的异常交由主线程重新抛出
+            reader_error.append(e)
+        finally:
+            read_q.put(None)
+
+    def _collector():
+        while True:
+            item = out_q.get()
+            if item is None:
+                break
+            i, m = item
+            moments[:, i] = m
+
+    reader = threading.Thread(target=_reader, daemon=True)
+    collector = threading.Thread(target=_collector, daemon=True)
+    reader.start()
+    collector.start()
+
+    try:
+        while True:
+            item = read_q.get()
+            if item is None:
+                break
+            i, frame = item
+            # 与 generate_pixel_series 相同，每个 TRACK_CHUNK_FRAMES 分段开始时重置跨帧状态
+            if i % TRACK_CHUNK_FRAMES == 0:
+                tracker.reset()
+            out_q.put((i, tracker.track_marker_moments(frame)))
+    finally:
+        out_q.put(None)
+        collector.join()
+        # 主线程提前退出时排空读取队列，避免读取线程阻塞在 put 上
+        while reader.is_alive():
+            try:
+                read_q.get(timeout=0.1)
+            except queue.Empty:
+                pass
+
+    if reader_error:
+        raise reader_error[0]
+
+    return _to_relative_series(_moments_to_coords(moments))
+
+def _moments_to_coords(moments: np.ndarray) -> np.ndarray:
+    """
+    (3, N) 矩缓冲区 → (2, N) 绝对质心坐标：整段一次向量化除法，丢失帧的 NaN 自然传播。
+    """
+    return moments[1:] / moments[0]
+
+def _to_relative_series(coords: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    将 (2, N) 绝对坐标原地转换为相对第一帧有效检测的位移序列，并检查检测率。
+    """
+    total_frames = coords.shape[1]
+    valid = np.isfinite(coords[0])
+    detection_count = int(np.count_nonzero(valid))  # 成功检测的帧数
+
     # 题目要求：记录标记物中心点相对于初始位置的**原始像素位移序列**
-    # 所以我们需要记录第一帧成功检测的位置作为基准
-    
-    x0, y0 = None, None
-    detection_count = 0  # 成功检测的帧数
-    total_frames = len(frame_list)
-    
-    for i, frame in enumerate(frame_list):
-        x, y = tracker.track_marker_subpix(frame)
-        
-        if np.isnan(x):
-            # 如果丢失跟踪，可以使用上一帧的位置，或者保持 NaN 后续插值
-            # 这里为了简单，如果丢失则填 NaN
-            x_list.append(np.nan)
-            y_list.append(np.nan)
-            continue
-        else:
-            detection_count += 1
-            
-        if x0 is None:
-            x0, y0 = x, y
-            
-        # 计算相对位移
-        dx = x - x0
-        dy = y - y0
-        
-        x_list.append(dx)
-        y_list.append(dy)
+    # 以第一帧成功检测的位置作为基准
+    if detection_count > 0:
+        first_valid_idx = int(np.argmax(valid))
+        coords -= coords[:, first_valid_idx:first_valid_idx + 1]
     
     # 检查检测率
     detection_rate = detection_count / total_frames if total_frames > 0 else 0.0
@@ -120,4 +566,5 @@ def generate_pixel_series(frame_list: List[np.ndarray], config: TrackingConfig)
     elif detection_rate < 0.1:  # 检测率低于10%
         print(f"警告：AruCo标记物检测率较低 ({detection_rate*100:.1f}%)，仅 {detection_count}/{total_frames} 帧成功检测。")
     
-    return np.array(x_list), np.array(y_list)
+    # 两行均为连续内存，直接返回视图，无需再复制
+    return coords[0], coords[1]
@@ -1,27 +1,178 @@
 import json
 import numpy as np
 import os
+import struct
 import sys
-from typing import List, Tuple
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from typing import BinaryIO, Iterator, List, Optional, Tuple, Union
 
 # Add project root to path
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 from data_structs.analysis_data import CalibrationData, TrackingConfig, DisplacementSeries
-from image_analysis.tracking_core import generate_pixel_series
-from image_analysis.displacement_calc import pixel_to_physical, decompose_vibration
+from image_analysis.tracking_core import generate_pixel_series, generate_pixel_series_stream
+from image_analysis.displacement_calc import pixel_to_flap_edge
+
+# npz 来源：文件路径，或可 seek 的二进制文件对象（如 Streamlit 上传的 BytesIO）
+NpzSource = Union[str, os.PathLike, BinaryIO]
 
 def load_config(config_path: str):
     with open(config_path, 'r') as f:
         data = json.load(f)
     return data
 
+def _as_uint8_frame(frame) -> np.ndarray:
+    """
+    确保单帧为 uint8 numpy 数组（与 load_frames_from_npz 的规范化规则一致）
+    """
+    if isinstance(frame, np.ndarray):
+        if frame.dtype != np.uint8:
+            frame = frame.astype(np.uint8)
+        return frame
+    return np.asarray(frame, dtype=np.uint8)
+
+def _parse_fps(fps_value) -> int:
+    if isinstance(fps_value, np.ndarray):
+        return int(fps_value[0]) if fps_value.size > 0 else int(fps_value)
+    return int(fps_value)
+
+def _read_npz_member_header(npz_path: NpzSource, member: str) -> Optional[Tuple[Tuple[int, ...], np.dtype]]:
+    """
+    读取npz内某个 .npy 成员的头信息 (shape, dtype)。
+    仅当该成员是可按行顺序流式读取的普通（非 object、C 顺序）数组时返回，否则返回 None。
+    """
+    with zipfile.ZipFile(npz_path) as zf:
+        with zf.open(member) as fp:
+            version = np.lib.format.read_magic(fp)
+            if version == (1, 0):
+                shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(fp)
+            elif version == (2, 0):
+                shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(fp)
+            else:
+                return None
+    if dtype.hasobject or fortran_order or len(shape) < 2:
+        return None
+    return shape, dtype
+
+def _stream_npz_frames(npz_path: NpzSource, member: str, shape: Tuple[int, ...], dtype: np.dtype) -> Iterator[np.ndarray]:
+    """
+    直接从zip成员中按帧大小顺序读取 (N, H, W[, C]) 数组，每次只在内存中保留一帧。
+    """
+    frame_shape = shape[1:]
+    frame_nbytes = int(np.prod(frame_shape)) * dtype.itemsize
+    with zipfile.ZipFile(npz_path) as zf:
+        with zf.open(member) as fp:
+            version = np.lib.format.read_magic(fp)
+            if version == (1, 0):
+                np.lib.format.read_array_header_1_0(fp)
+            else:
+                np.lib.format.read_array_header_2_0(fp)
+            for _ in range(shape[0]):
+                buf = fp.read(frame_nbytes)
+                if len(buf) < frame_nbytes:
+                    raise ValueError("NPZ文件中的frames数据不完整")
+                yield _as_uint8_frame(np.frombuffer(buf, dtype=dtype).reshape(frame_shape))
+
+def _stored_npz_member_view(npz_path: NpzSource, member: str) -> Optional[np.ndarray]:
+    """
+    未压缩 (ZIP_STORED) 的 .npy 成员：根据 zip 本地文件头偏移直接定位数组数据，
+    文件路径用 np.memmap、内存文件对象用 getbuffer() 构造零拷贝只读视图，不经过 zipfile 的逐块读取。
+    压缩成员、object / Fortran 顺序数组或无法取得缓冲区时返回 None。
+    """
+    with zipfile.ZipFile(npz_path) as zf:
+        info = zf.getinfo(member)
+    if info.compress_type != zipfile.ZIP_STORED:
+        return None
+    
+    fp = open(npz_path, 'rb') if isinstance(npz_path, (str, os.PathLike)) else npz_path
+    try:
+        # 本地文件头: 30 字节定长部分 + 文件名 + extra 字段（长度与中央目录中的可能不同）
+        fp.seek(info.header_offset)
+        local_header = fp.read(30)
+        if len(local_header) < 30 or local_header[:4] != b'PK\x03\x04':
+            return None
+        name_len, extra_len = struct.unpack('<HH', local_header[26:30])
+        fp.seek(info.header_offset + 30 + name_len + extra_len)
+        
+        version = np.lib.format.read_magic(fp)
+        if version == (1, 0):
+            shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(fp)
+        elif version == (2, 0):
+            shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(fp)
+        else:
+            return None
+        if dtype.hasobject or fortran_order or len(shape) < 2:
+            return None
+        data_offset = fp.tell()
+    finally:
+        if fp is not npz_path:
+            fp.close()
+    
+    if isinstance(npz_path, (str, os.PathLike)):
+        return np.memmap(npz_path, dtype=dtype, mode='r', offset=data_offset, shape=shape)
+    if hasattr(npz_path, 'getbuffer'):
+        count = int(np.prod(shape))
+        view = np.frombuffer(npz_path.getbuffer(), dtype=dtype, count=count, offset=data_offset).reshape(shape)
+        view.setflags(write=False)
+        return view
+    return None
+
+def iter_frames_from_npz(npz_path: NpzSource) -> Tuple[Iterator[np.ndarray], int, int]:
+    """
+    惰性读取npz文件中的视频帧：返回 (帧迭代器, 帧数, 帧率)。
+    
+    - frames 为未压缩 (np.savez) 的普通数组时，直接内存映射zip中的数组数据，逐帧返回零拷贝视图。
+    - frames 为压缩存储的普通数组（如 (N, H, W, 3) uint8）时，直接从zip成员中逐帧读取，
+      不会把整段视频解压到内存（npz 不支持 np.load 的 mmap_mode）。
+    - frames 为 object 数组（旧格式）时只能整体反序列化，逐帧的规范化仍在迭代时进行。
+    
+    :param npz_path: npz文件路径，或可 seek 的二进制文件对象（直接在内存中读取，无需先落盘）
+    :return: (frame_iter, n_frames, fps)
+    """
+    if isinstance(npz_path, (str, os.PathLike)):
+        if not os.path.exists(npz_path):
+            raise FileNotFoundError(f"NPZ文件不存在: {npz_path}")
+    else:
+        # np.load 从文件对象的当前位置开始读取
+        npz_path.seek(0)
+    
+    try:
+        data = np.load(npz_path, allow_pickle=True)
+        
+        if 'frames' not in data:
+            raise ValueError("NPZ文件中缺少'frames'键")
+        if 'fps' not in data:
+            raise ValueError("NPZ文件中缺少'fps'键")
+        
+        # NpzFile 按键惰性读取：这里只读取 fps，不会触碰 frames 数据
+        fps = _parse_fps(data['fps'])
+        
+        frames_view = _stored_npz_member_view(npz_path, 'frames.npy')
+        if frames_view is not None:
+            return (_as_uint8_frame(frame) for frame in frames_view), int(frames_view.shape[0]), fps
+        
+        header = _read_npz_member_header(npz_path, 'frames.npy')
+        if header is not None:
+            shape, dtype = header
+            return _stream_npz_frames(npz_path, 'frames.npy', shape, dtype), int(shape[0]), fps
+        
+        frames_array = data['frames']
+    except Exception as e:
+        raise ValueError(f"加载NPZ文件失败: {str(e)}")
+    
+    def _frames():
+        for frame in frames_array:
+            yield _as_uint8_frame(frame)
+    
+    return _frames(), len(frames_array), fps
+
 def load_frames_from_npz(npz_path: str) -> Tuple[List[np.ndarray], int]:
     """
     从npz文件加载视频帧序列和帧率（Frontend生成的格式）
     
     :param npz_path: npz文件路径
-    :return: (frames, fps) - 帧序列列表和帧率
+    :return: (frames, fps) - 帧序列（列表，或连续存储时的 (N, H, W, 3) 数组）和帧率
     """
     if not os.path.exists(npz_path):
         raise FileNotFoundError(f"NPZ文件不存在: {npz_path}")
@@ -42,8 +193,11 @@ def load_frames_from_npz(npz_path: str) -> Tuple[List[np.ndarray], int]:
         
         # 将frames数组转换为列表
         if isinstance(frames_array, np.ndarray):
+            # 连续存储的 (N, H, W[, C]) 数组：整体返回，按 frames[i] 取到的是视图，无需逐帧复制
+            if frames_array.dtype != object and frames_array.ndim >= 3:
+                frames = frames_array if frames_array.dtype == np.uint8 else frames_array.astype(np.uint8)
             # 如果是对象数组，需要逐个提取并确保是numpy数组
-            if frames_array.dtype == object:
+            elif frames_array.dtype == object:
                 frames = []
                 for i, frame in enumerate(frames_array):
                     # 确保每个frame是numpy数组
@@ -72,10 +226,7 @@ def load_frames_from_npz(npz_path: str) -> Tuple[List[np.ndarray], int]:
                     frames.append(frame_arr)
         
         # 提取fps值
-        if isinstance(fps_value, np.ndarray):
-            fps = int(fps_value[0]) if fps_value.size > 0 else int(fps_value)
-        else:
-            fps = int(fps_value)
+        fps = _parse_fps(fps_value)
         
         print(f"成功加载NPZ文件: {npz_path}")
         print(f"  帧数: {len(frames)}")
@@ -88,9 +239,9 @@ def load_frames_from_npz(npz_path: str) -> Tuple[List[np.ndarray], int]:
     except Exception as e:
         raise ValueError(f"加载NPZ文件失败: {str(e)}")
 
-def run_image_analysis(stabilized_frames: List[np.ndarray], fs: int) -> DisplacementSeries:
+def _load_analysis_config() -> Tuple[CalibrationData, TrackingConfig]:
     """
-    对外接口：接收 B 的稳定帧列表和帧率 fs，执行完整的图像分析流程。
+    读取 config/camera_params.json 并解析为标定数据与跟踪配置
     """
     # 1. 加载配置
     # 假设 config 目录在当前文件同级目录下
@@ -119,21 +270,17 @@ def run_image_analysis(stabilized_frames: List[np.ndarray], fs: int) -> Displace
         marker_id=track_conf['marker_id'],
         subpix_win_size=track_conf['subpix_win_size']
     )
-    
-    # 2. 亚像素级特征点跟踪
-    print("Starting sub-pixel tracking...")
-    dx_pix, dy_pix = generate_pixel_series(stabilized_frames, tracking_config)
-    
-    # 3. 像素转物理位移
-    print("Converting to physical units...")
-    dx_mm, dy_mm = pixel_to_physical(dx_pix, dy_pix, calib_data)
-    
-    # 4. 坐标系分解
-    print("Decomposing vibration components...")
-    d_flap, d_edge = decompose_vibration(dx_mm, dy_mm, calib_data.leaf_angle_deg)
+    return calib_data, tracking_config
+
+def _build_displacement_series(dx_pix: np.ndarray, dy_pix: np.ndarray, n_frames: int, fs: int, calib_data: CalibrationData) -> DisplacementSeries:
+    """
+    将像素位移序列转换为物理位移、分解方向并封装为 DisplacementSeries
+    """
+    # 3-4. 像素转物理位移 + 坐标系分解（单次矩阵乘法完成）
+    print("Converting to physical units and decomposing vibration components...")
+    d_flap, d_edge = pixel_to_flap_edge(dx_pix, dy_pix, calib_data, calib_data.leaf_angle_deg)
     
     # 5. 构造时间戳
-    n_frames = len(stabilized_frames)
     if fs > 0:
         time_stamps = np.arange(n_frames) / fs
     else:
@@ -152,18 +299,61 @@ def run_image_analysis(stabilized_frames: List[np.ndarray], fs: int) -> Displace
     print("Image analysis completed.")
     return result
 
-def run_image_analysis_from_npz(npz_path: str) -> DisplacementSeries:
+def run_image_analysis(stabilized_frames: List[np.ndarray], fs: int) -> DisplacementSeries:
+    """
+    对外接口：接收 B 的稳定帧列表和帧率 fs，执行完整的图像分析流程。
+    stabilized_frames 也可以是 (N, H, W, 3) 的 uint8 数组，逐帧按视图访问。
+    """
+    calib_data, tracking_config = _load_analysis_config()
+    
+    # 2. 亚像素级特征点跟踪
+    print("Starting sub-pixel tracking...")
+    dx_pix, dy_pix = generate_pixel_series(stabilized_frames, tracking_config)
+    
+    return _build_displacement_series(dx_pix, dy_pix, len(stabilized_frames), fs, calib_data)
+
+def run_image_analysis_from_npz(npz_path: NpzSource) -> DisplacementSeries:
     """
     从npz文件加载数据并执行图像分析
     
-    :param npz_path: npz文件路径（由Frontend生成）
+    读取线程逐帧解出图像、主线程跟踪、收集线程写入结果，三者通过有界队列流水线化，
+    不再先把全部帧复制成列表再开始跟踪。
+    
+    :param npz_path: npz文件路径（由Frontend生成），或已在内存中的二进制文件对象
     :return: DisplacementSeries对象，包含切向和轴向的物理位移序列
     """
-    # 1. 从npz文件加载帧序列和帧率
-    frames, fps = load_frames_from_npz(npz_path)
+    # 1. 惰性打开npz文件中的帧序列和帧率
+    frame_iter, n_frames, fps = iter_frames_from_npz(npz_path)
+    print(f"成功打开NPZ文件: {getattr(npz_path, 'name', npz_path)}")
+    print(f"  帧数: {n_frames}")
+    print(f"  帧率: {fps} FPS")
+    
+    calib_data, tracking_config = _load_analysis_config()
+    
+    # 2. 流水线式亚像素跟踪
+    print("Starting sub-pixel tracking (pipelined)...")
+    dx_pix, dy_pix = generate_pixel_series_stream(frame_iter, n_frames, tracking_config)
+    
+    return _build_displacement_series(dx_pix, dy_pix, n_frames, fps, calib_data)
+
+def run_batch(npz_paths: List[str], max_workers: Optional[int] = None) -> List[DisplacementSeries]:
+    """
+    批量分析多个npz文件（多叶片/多段视频）：每个工作进程独立处理一个文件。
+    结果顺序与 npz_paths 一致。Windows 等 spawn 启动方式下，调用方需放在 if __name__ == "__main__": 之下。
+    
+    :param npz_paths: npz文件路径列表
+    :param max_workers: 进程数，默认取 CPU 核数与文件数中的较小值
+    :return: 与输入一一对应的 DisplacementSeries 列表
+    """
+    if not npz_paths:
+        return []
+    if max_workers is None:
+        max_workers = min(os.cpu_count() or 1, len(npz_paths))
+    if max_workers <= 1 or len(npz_paths) == 1:
+        return [run_image_analysis_from_npz(p) for p in npz_paths]
     
-    # 2. 调用现有的分析函数
-    return run_image_analysis(frames, fps)
+    with ProcessPoolExecutor(max_workers=max_workers) as ex:
+        return list(ex.map(run_image_analysis_from_npz, npz_paths))
 
 
 if __name__ == "__main__":
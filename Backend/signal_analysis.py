@@ -12,11 +12,46 @@ signal_analysis.py
 
 from __future__ import annotations
 
+import math
+import os
+import threading
 from dataclasses import dataclass, field
-from typing import Tuple, Optional, Dict, Any
+from functools import lru_cache
+from typing import Tuple, Optional, Dict, Any, List, Union
 
 import numpy as np
 from scipy import signal
+from scipy import fft as sp_fft
+
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+# pyFFTW 为可选依赖：可用时以 FFTW 计算 rfft，并缓存重复长度的 FFT 计划
+try:
+    import pyfftw
+    import pyfftw.interfaces.numpy_fft as _fftw_np
+    pyfftw.interfaces.cache.enable()
+    pyfftw.interfaces.cache.set_keepalive_time(60)
+    PYFFTW_AVAILABLE = True
+except ImportError:
+    PYFFTW_AVAILABLE = False
+
+# CuPy 为可选依赖：可用时 analyze_many_gpu 在 GPU 上批量滤波与 FFT
+try:
+    import cupy as cp
+    import cupyx.scipy.signal as cp_signal
+    CUPY_AVAILABLE = True
+except ImportError:
+    CUPY_AVAILABLE = False
+
+# 低于该长度的 FFT 走不做计划/缓存的直接路径
+_SHORT_FFT_LEN = 256
+
+# FFT 输入缓冲区按线程隔离（Streamlit 等可能在多个线程中同时做分析）
+_fft_local = threading.local()
 
 
 # =========================
@@ -58,6 +93,9 @@ class AnalysisResult:
 
 #将输入变为1D浮点数组，避免上有传入list、二维数组等导致报错
 def _as_1d_float(x: np.ndarray) -> np.ndarray:
+    # 常见情况（上游已是 1D float64 数组，如频谱输出）直接返回，不经过 asarray/reshape
+    if type(x) is np.ndarray and x.ndim == 1 and x.dtype == np.float64:
+        return x
     x = np.asarray(x, dtype=float).reshape(-1)
     return x
 
@@ -73,6 +111,7 @@ def _validate_fs(fs: int) -> int:
 def _sanitize_signal(x: np.ndarray) -> np.ndarray:
     """
     去除 NaN/Inf：用线性插值填补；若全是无效值则抛错。
+    输入先经 _as_1d_float 规范化（已是 1D float64 数组时直接使用）；不会修改输入，有无效值时返回填补后的新数组。
     """
     x = _as_1d_float(x)
     if x.size == 0:
@@ -85,11 +124,54 @@ def _sanitize_signal(x: np.ndarray) -> np.ndarray:
     if not mask.any():
         raise ValueError("Signal contains no finite values (all NaN/Inf).")
 
+    if NUMBA_AVAILABLE:
+        return _fill_nan_linear(x)
+
     idx = np.arange(x.size)
     x_filled = x.copy()
     x_filled[~mask] = np.interp(idx[~mask], idx[mask], x[mask])
     return x_filled
 
+
+if NUMBA_AVAILABLE:
+    @njit(cache=True)
+    def _fill_nan_linear(x):
+        """
+        单次扫描的线性插值补洞：逐段找出连续的 NaN/Inf，用两端有效值线性填充；
+        首尾的无效段取最近的有效值（与 np.interp 的端点行为一致）。调用方保证至少有一个有限值。
+        """
+        n = x.size
+        out = x.copy()
+        i = 0
+        while i < n:
+            if np.isfinite(out[i]):
+                i += 1
+                continue
+            j = i
+            while j < n and not np.isfinite(out[j]):
+                j += 1
+            if i == 0:
+                for k in range(i, j):
+                    out[k] = out[j]
+            elif j == n:
+                for k in range(i, j):
+                    out[k] = out[i - 1]
+            else:
+                left = out[i - 1]
+                step = (out[j] - left) / (j - i + 1)
+                for k in range(i, j):
+                    out[k] = left + step * (k - i + 1)
+            i = j
+        return out
+
+def _clean_input(x: np.ndarray, already_clean: bool) -> np.ndarray:
+    """
+    already_clean=True 时跳过 NaN/Inf 清洗，只做 1D float64 规范化（已规范化的输入直接返回），否则完整清洗。
+    """
+    if already_clean:
+        return _as_1d_float(x)
+    return _sanitize_signal(x)
+
 #检查time_stamps是否严格递增
 def _check_and_resample_if_needed(
     time_stamps: np.ndarray,
@@ -99,6 +181,7 @@ def _check_and_resample_if_needed(
 ) -> Tuple[np.ndarray, np.ndarray, Dict[str, Any]]:
     """
     检查 time_stamps 是否近似等间隔；若不等间隔，插值重采样到均匀时间网格。
+    time_stamps 与 x 通常已由 analyze_displacement_series 规范化为 1D float64 数组，此时 _as_1d_float 直接返回。
     """
     t = _as_1d_float(time_stamps)
     x = _as_1d_float(x)
@@ -144,7 +227,7 @@ def _check_and_resample_if_needed(
     # 重采样到均匀网格
     t0, t1 = float(t[0]), float(t[-1])
     # 目标采样点数：按 fs 覆盖原时长
-    N_target = int(np.floor((t1 - t0) * fs)) + 1
+    N_target = int(math.floor((t1 - t0) * fs)) + 1
     if N_target < 8:
         # 数据太短，重采样意义不大
         return t, x, meta
@@ -173,7 +256,7 @@ def _clamp_band(low_cut: float, high_cut: float, fs: int, margin: float = 0.95)
     meta = {"band_input": (low, high), "band_used": None, "nyquist": nyq}
 
     # 基本合法性
-    if not np.isfinite(low) or not np.isfinite(high):
+    if not math.isfinite(low) or not math.isfinite(high):
         raise ValueError(f"Band edges must be finite, got low_cut={low}, high_cut={high}")
 
     # clamp
@@ -189,6 +272,96 @@ def _clamp_band(low_cut: float, high_cut: float, fs: int, margin: float = 0.95)
     return low, high, meta
 
 
+def _linear_detrend(x: np.ndarray) -> np.ndarray:
+    """
+    闭式最小二乘线性去趋势（等价于 signal.detrend(x, type="linear")），返回新数组。
+    对等间隔下标 i，斜率 a = 12 / (N (N^2 - 1)) * Σ (i - (N-1)/2) x[i]，拟合直线过 (mean(i), mean(x))。
+    要求 N >= 2（filter_signal 只在 N >= 3 时去趋势）。
+    """
+    if NUMBA_AVAILABLE:
+        return _linear_detrend_kernel(x)
+
+    N = x.size
+    ic = np.arange(N, dtype=np.float64) - 0.5 * (N - 1)
+    a = 12.0 / (N * (N * N - 1.0)) * float(np.dot(ic, x))
+    return x - (float(np.mean(x)) + a * ic)
+
+
+if NUMBA_AVAILABLE:
+    @njit(cache=True)
+    def _linear_detrend_kernel(x):
+        """
+        _linear_detrend 的 Numba 版本：一次遍历求 Σx 与 Σ(i - ic)x，再一次遍历写出残差。
+        """
+        N = x.size
+        ic = 0.5 * (N - 1)
+        sx = 0.0
+        sxi = 0.0
+        for i in range(N):
+            sx += x[i]
+            sxi += (i - ic) * x[i]
+        mean = sx / N
+        a = 12.0 / (N * (N * N - 1.0)) * sxi
+        out = np.empty_like(x)
+        for i in range(N):
+            out[i] = x[i] - (mean + a * (i - ic))
+        return out
+
+
+@lru_cache(maxsize=64)
+def _design_butter_sos(order: int, low: float, high: float, fs: int) -> np.ndarray:
+    """
+    Butterworth 带通 SOS 系数设计（只与参数有关，与信号无关），按 (order, low, high, fs) 缓存。
+    返回的数组被所有调用方共享，不得原地修改（sosfilt/sosfiltfilt 只读取 sos；
+    其 Cython 实现要求可写缓冲区，因此这里不设为只读）。
+    """
+    sos = signal.butter(
+        N=order,
+        Wn=[low, high],
+        btype="bandpass",
+        fs=fs,
+        output="sos",
+    )
+    return sos
+
+
+@lru_cache(maxsize=64)
+def _sosfilt_zi(order: int, low: float, high: float, fs: int) -> np.ndarray:
+    """
+    与 _design_butter_sos 配套的 sosfilt 阶跃稳态初始状态（乘以首样本即为 zi），同样按参数缓存。
+    """
+    return signal.sosfilt_zi(_design_butter_sos(order, low, high, fs))
+
+
+_warmup_started = False
+
+
+def warmup_kernels(background: bool = True) -> None:
+    """
+    预先触发本模块 Numba 内核的编译（cache=True 时从 __pycache__ 中的磁盘缓存加载），
+    避免首次分析请求承担 JIT 延迟。可重复调用，只执行一次；未安装 numba 时为空操作。
+
+    :param background: True 时在后台守护线程中进行，不阻塞调用方
+    """
+    global _warmup_started
+    if not NUMBA_AVAILABLE or _warmup_started:
+        return
+    _warmup_started = True
+
+    def _run():
+        x = np.array([0.0, np.nan, 1.0, 2.0])
+        y = np.arange(4, dtype=np.float64)
+        _fill_nan_linear(x)
+        _ppmrms(y)
+        _linear_detrend_kernel(y)
+        _dom_freq_kernel(y)
+
+    if background:
+        threading.Thread(target=_run, daemon=True).start()
+    else:
+        _run()
+
+
 # =========================
 # 核心函数
 # =========================
@@ -200,38 +373,47 @@ def filter_signal(
     high_cut: float,
     order: int = 4,
     detrend: bool = True,
+    zero_phase: bool = True,
+    _already_clean: bool = False,
 ) -> Tuple[np.ndarray, Dict[str, Any]]:
     """
     对位移信号进行带通滤波（工程增强版）。
     返回滤波结果 + meta（便于记录参数）。
+
+    zero_phase=True 时用 sosfiltfilt（前向+反向，零相位，计算量约 2 倍并需边缘延拓）；
+    False 时用单次 sosfilt（约快一倍，幅度谱不变但有相位滞后，开头约数个滤波器时间常数内存在瞬态，
+    以初值 x[0] 设定滤波器状态以减小瞬态）。只关心幅值与频谱时可设为 False。
+
+    _already_clean=True 表示调用方保证输入已是有限值的 1D float64 数组（内部使用），跳过再次清洗。
     """
     fs = _validate_fs(fs)
-    x = _sanitize_signal(d_t_mm)
+    x = _clean_input(d_t_mm, _already_clean)
 
     if x.size == 0:
         return x, {"note": "empty_signal"}
 
-    # 去趋势/去均值：先做 detrend 再去均值更稳
+    # 去趋势/去均值：线性去趋势的残差均值已为 0，无需再单独去均值
     if detrend and x.size >= 3:
-        x = signal.detrend(x, type="linear")
-    x = x - float(np.mean(x))
+        x = _linear_detrend(x)
+    else:
+        x = x - float(np.mean(x))
 
     low, high, band_meta = _clamp_band(low_cut, high_cut, fs)
-    sos = signal.butter(
-        N=order,
-        Wn=[low, high],
-        btype="bandpass",
-        fs=fs,
-        output="sos",
-    )
+    sos = _design_butter_sos(int(order), low, high, fs)
 
-    # 零相位滤波，避免相位畸变
-    x_filt = signal.sosfiltfilt(sos, x)
+    if zero_phase:
+        # 零相位滤波，避免相位畸变
+        x_filt = signal.sosfiltfilt(sos, x)
+        filter_name = "butterworth_bandpass_sosfiltfilt"
+    else:
+        x_filt, _ = signal.sosfilt(sos, x, zi=_sosfilt_zi(int(order), low, high, fs) * x[0])
+        filter_name = "butterworth_bandpass_sosfilt"
 
     meta = {
-        "filter": "butterworth_bandpass_sosfiltfilt",
+        "filter": filter_name,
         "order": order,
         "detrend": detrend,
+        "zero_phase": zero_phase,
         **band_meta,
     }
     return x_filt, meta
@@ -245,28 +427,85 @@ def calculate_time_domain_amp(d_t_mm_filtered: np.ndarray) -> Tuple[float, float
     if x.size == 0:
         return 0.0, 0.0
 
-    A_pp_mm = float(np.max(x) - np.min(x))
-    A_rms_mm = float(np.sqrt(np.mean(x ** 2)))
+    if NUMBA_AVAILABLE:
+        A_pp_mm, A_rms_mm = _ppmrms(x)
+        return float(A_pp_mm), float(A_rms_mm)
+
+    # ptp 一次调用求峰-峰值；dot(x, x) 为单次遍历的 BLAS ddot，不产生 x**2 临时数组
+    A_pp_mm = float(np.ptp(x))
+    A_rms_mm = float(math.sqrt(np.dot(x, x) / x.size))
     return A_pp_mm, A_rms_mm
 
 
-def calculate_fft_spectrum(
-    d_t_mm_filtered: np.ndarray,
-    fs: int,
-    window: str = "hann",
-    zero_pad_to: Optional[int] = None,
-) -> Tuple[np.ndarray, np.ndarray, Dict[str, Any]]:
+if NUMBA_AVAILABLE:
+    @njit(fastmath=True, cache=True)
+    def _ppmrms(x):
+        """
+        单次遍历同时求峰-峰值与 RMS（最小值、最大值、平方和保存在标量中，无临时数组）。
+        调用方保证 x 非空。
+        """
+        mn = x[0]
+        mx = x[0]
+        ss = 0.0
+        for i in range(x.size):
+            v = x[i]
+            if v < mn:
+                mn = v
+            if v > mx:
+                mx = v
+            ss += v * v
+        return mx - mn, math.sqrt(ss / x.size)
+
+
+def _fft_buffer(nfft: int) -> np.ndarray:
     """
-    计算单边幅度谱（带窗函数与幅值校正），返回 (freqs, X_amp, meta)。
+    取出长度为 nfft 的 float64 FFT 输入缓冲区（pyFFTW 可用时为 SIMD 对齐内存），按线程、按长度复用。
     """
-    fs = _validate_fs(fs)
-    x = _sanitize_signal(d_t_mm_filtered)
-    N = x.size
+    bufs = getattr(_fft_local, "bufs", None)
+    if bufs is None:
+        bufs = _fft_local.bufs = {}
+    buf = bufs.get(nfft)
+    if buf is None:
+        buf = pyfftw.empty_aligned(nfft, dtype="float64") if PYFFTW_AVAILABLE else np.empty(nfft, dtype=np.float64)
+        if len(bufs) >= 8:
+            bufs.clear()
+        bufs[nfft] = buf
+    return buf
+
+
+def _rfft(buf: np.ndarray) -> np.ndarray:
+    """
+    对 _fft_buffer 取出的缓冲区做实数 FFT（缓冲区内容随后可被覆盖）：
+    pyFFTW 可用时以多线程 FFTW 计算（计划按长度缓存），否则用 scipy.fft.rfft（pocketfft，多线程）。
+    """
+    if not PYFFTW_AVAILABLE:
+        return sp_fft.rfft(buf, workers=-1, overwrite_x=True)
+    return _fftw_np.rfft(buf, threads=os.cpu_count() or 1, planner_effort="FFTW_MEASURE", overwrite_input=True)
+
+
+@lru_cache(maxsize=32)
+def _rfftfreq(nfft: int, fs: int) -> np.ndarray:
+    """
+    rfft 频率轴（只与 nfft、fs 有关），按参数缓存；返回只读数组。
+    """
+    freqs = sp_fft.rfftfreq(nfft, d=1.0 / fs)
+    freqs.setflags(write=False)
+    return freqs
 
-    if N == 0:
-        return np.array([]), np.array([]), {"note": "empty_signal"}
 
-    # 窗函数
+def _get_window(window: Optional[str], N: int) -> Tuple[np.ndarray, str, float]:
+    """
+    长度为 N 的窗函数，返回 (w, window_name, coherent_gain)；w 为只读数组。
+    窗表只与 (window, N) 有关，按参数缓存；不可哈希的 window 参数（如列表）不走缓存。
+    """
+    try:
+        return _get_window_cached(window, N)
+    except TypeError:
+        return _get_window_cached.__wrapped__(window, N)
+
+
+@lru_cache(maxsize=32)
+def _get_window_cached(window: Optional[str], N: int) -> Tuple[np.ndarray, str, float]:
     if window is None or window == "none":
         w = np.ones(N, dtype=float)
         window_name = "none"
@@ -281,25 +520,89 @@ def calculate_fft_spectrum(
     cg = float(np.mean(w))
     if cg <= 0:
         cg = 1.0
+    w.setflags(write=False)
+    return w, window_name, cg
 
-    xw = x * w
 
-    # FFT 长度（零填充可提升频率轴分辨率，不提升真实信息量）
-    nfft = int(zero_pad_to) if (zero_pad_to is not None) else N
+def _choose_nfft(N: int, zero_pad_to: Optional[Union[int, str]]) -> int:
+    """
+    FFT 长度（零填充可提升频率轴分辨率，不提升真实信息量）。
+    未指定时 nfft = N；zero_pad_to="fast" 时取 >= N 的最小 2/3/5-光滑长度，FFT 走快速基而非慢速的混合基路径。
+    注意 "fast" 会改变频率网格：频点数、主频估计与 peak_ratio 等指标都与 nfft = N 时不同，因此只作为显式选项。
+    """
+    if zero_pad_to is None:
+        nfft = N
+    elif zero_pad_to == "fast":
+        nfft = sp_fft.next_fast_len(N, real=True)
+    else:
+        nfft = int(zero_pad_to)
     if nfft < N:
         nfft = N
-    # 取为 2 的幂常更快（可选）
-    # nfft = int(2 ** np.ceil(np.log2(nfft)))
+    return nfft
+
+
+def _abs_scaled(X_complex: np.ndarray, scale: float) -> np.ndarray:
+    """
+    scale * |X|，缩放在 np.abs 的输出上原地完成，不再多分配一个 N 长临时数组。
+    （实测 NumPy 的复数 abs 已向量化，比手写 sqrt(re^2 + im^2) 更快，因此保留 np.abs。）
+    """
+    out = np.abs(X_complex)
+    out *= scale
+    return out
+
+
+def calculate_fft_spectrum(
+    d_t_mm_filtered: np.ndarray,
+    fs: int,
+    window: str = "hann",
+    zero_pad_to: Optional[Union[int, str]] = None,
+    freq_clip: Optional[Tuple[float, float]] = None,
+    _already_clean: bool = False,
+) -> Tuple[np.ndarray, np.ndarray, Dict[str, Any]]:
+    """
+    计算单边幅度谱（带窗函数与幅值校正），返回 (freqs, X_amp, meta)。
+    zero_pad_to 为 None 时 nfft = N；为整数时零填充到该长度；为 "fast" 时取 >= N 的最小快速 FFT 长度（见 _choose_nfft）。
+    给定 freq_clip=(fmin, fmax) 时只对该频段内的频点求幅值并返回该频段的谱（FFT 本身仍为全长）。
+    _already_clean 含义同 filter_signal。
+    """
+    fs = _validate_fs(fs)
+    x = _clean_input(d_t_mm_filtered, _already_clean)
+    N = x.size
 
-    X_complex = np.fft.rfft(xw, n=nfft)
-    freqs = np.fft.rfftfreq(nfft, d=1.0 / fs)
+    if N == 0:
+        return np.array([]), np.array([]), {"note": "empty_signal"}
+
+    nfft = _choose_nfft(N, zero_pad_to)
+
+    if nfft < _SHORT_FFT_LEN:
+        # 短信号：FFT 本身很快，FFTW 计划、窗表缓存与复用缓冲区的开销反而占主导，直接计算
+        w, window_name, cg = _get_window_cached.__wrapped__(window, N)
+        X_complex = np.fft.rfft(x * w, n=nfft)
+    else:
+        # 窗函数 + coherent gain
+        w, window_name, cg = _get_window(window, N)
+
+        # 加窗结果直接写入复用的 FFT 缓冲区，尾部零填充
+        buf = _fft_buffer(nfft)
+        np.multiply(x, w, out=buf[:N])
+        buf[N:] = 0.0
+        X_complex = _rfft(buf)
+    freqs = _rfftfreq(nfft, fs)
+
+    # 只保留 [i0, i1) 频段：频率轴单调，用 searchsorted 定位，段外频点不求幅值
+    i0, i1 = 0, freqs.size
+    if freq_clip is not None:
+        i0 = int(np.searchsorted(freqs, float(freq_clip[0]), side="left"))
+        i1 = int(np.searchsorted(freqs, float(freq_clip[1]), side="right"))
+        i1 = max(i0, i1)
+    freqs = freqs[i0:i1]
 
     # 单边幅度谱校正：2/(N*cg) * |X|
     # 注意：DC(0Hz) 和 Nyquist(若存在) 不应该乘 2，这里做标准处理
-    X_amp = (2.0 / (N * cg)) * np.abs(X_complex)
-    if X_amp.size > 0:
+    X_amp = _abs_scaled(X_complex[i0:i1], 2.0 / (N * cg))
+    if X_amp.size > 0 and i0 == 0:
         X_amp[0] = X_amp[0] / 2.0
-    if (nfft % 2 == 0) and (X_amp.size > 1):  # Nyquist 存在于 rfft 末端
+    if (nfft % 2 == 0) and (X_amp.size > 1) and i1 == X_complex.size:  # Nyquist 存在于 rfft 末端
         X_amp[-1] = X_amp[-1] / 2.0
 
     meta = {
@@ -312,6 +615,60 @@ def calculate_fft_spectrum(
     return freqs, X_amp, meta
 
 
+def _band_peak_stats(
+    freqs: np.ndarray,
+    X_amp: np.ndarray,
+    fmin: float,
+    fmax: float,
+) -> Optional[Tuple[float, float, float, float]]:
+    """
+    搜索频段 [fmin, fmax] 内的峰值统计：返回 (f_peak, peak_amp, second, noise_floor)，
+    noise_floor 为频段内幅值的中位数；频段内没有频点时返回 None。
+    freqs 须单调递增（rfftfreq 的输出），频段用 searchsorted 定位为连续切片，不构造布尔掩码。
+    """
+    i0 = int(np.searchsorted(freqs, fmin, side="left"))
+    i1 = int(np.searchsorted(freqs, fmax, side="right"))
+    if i1 <= i0:
+        return None
+
+    f_band = freqs[i0:i1]
+    X_band = X_amp[i0:i1]
+
+    if NUMBA_AVAILABLE:
+        idx_local, peak_amp, second, noise_floor = _dom_freq_kernel(X_band)
+        return float(f_band[idx_local]), float(peak_amp), float(second), float(noise_floor)
+
+    # 找最大峰与次峰：argmax 取主峰（多个并列时取低频一侧），O(M) 的 partition 取次峰，无需整体排序
+    idx_local = int(np.argmax(X_band))
+    peak_amp = float(X_band[idx_local])
+    second = float(np.partition(X_band, -2)[-2]) if X_band.size >= 2 else 0.0
+    f_peak = float(f_band[idx_local])
+    return f_peak, peak_amp, second, float(np.median(X_band))
+
+
+if NUMBA_AVAILABLE:
+    @njit(cache=True)
+    def _dom_freq_kernel(X):
+        """
+        单次遍历频段内幅值（连续切片）：同时更新最大峰（及下标）与次峰，再求中位数。
+        返回 (idx, peak_amp, second, median)；调用方保证 X 非空。
+        """
+        top1 = -np.inf
+        top2 = -np.inf
+        idx = 0
+        for i in range(X.size):
+            v = X[i]
+            if v > top1:
+                top2 = top1
+                top1 = v
+                idx = i
+            elif v > top2:
+                top2 = v
+        if X.size < 2:
+            top2 = 0.0
+        return idx, top1, top2, np.median(X)
+
+
 def find_dominant_frequency(
     freqs: np.ndarray,
     X_amp: np.ndarray,
@@ -320,6 +677,7 @@ def find_dominant_frequency(
 ) -> Tuple[float, Dict[str, Any]]:
     """
     在指定频段内寻找幅值谱最大峰，返回主频 + quality 指标。
+    freqs 须单调递增（calculate_fft_spectrum 的输出即满足）。
     """
     freqs = _as_1d_float(freqs)
     X_amp = _as_1d_float(X_amp)
@@ -333,39 +691,73 @@ def find_dominant_frequency(
     # 限定搜索范围
     fmin = float(fmin)
     fmax = float(fmax)
-    if not np.isfinite(fmin) or not np.isfinite(fmax) or fmin <= 0:
+    if not math.isfinite(fmin) or not math.isfinite(fmax) or fmin <= 0:
         raise ValueError(f"Invalid fmin/fmax: {fmin}/{fmax}")
     if fmin >= fmax:
         raise ValueError(f"Invalid search band: fmin >= fmax ({fmin} >= {fmax})")
 
-    band_mask = (freqs >= fmin) & (freqs <= fmax)
-    if not np.any(band_mask):
+    stats = _band_peak_stats(freqs, X_amp, fmin, fmax)
+    if stats is None:
         return 0.0, {"note": "no_bins_in_search_band", "fmin": fmin, "fmax": fmax}
+    f_peak, peak_amp, second, noise_floor = stats
+    return f_peak, _peak_quality(peak_amp, second, noise_floor, fmin, fmax)
 
-    f_band = freqs[band_mask]
-    X_band = X_amp[band_mask]
 
-    # 找最大峰
-    idx_local = int(np.argmax(X_band))
-    f_peak = float(f_band[idx_local])
-    peak_amp = float(X_band[idx_local])
-
-    # 质量指标：peak_ratio（主峰/次峰）、snr_db（主峰相对中位数噪声）
-    X_sorted = np.sort(X_band)
-    second = float(X_sorted[-2]) if X_sorted.size >= 2 else 0.0
+def _peak_quality(peak_amp: float, second: float, noise_floor: float, fmin: float, fmax: float) -> Dict[str, Any]:
+    """
+    质量指标：peak_ratio（主峰/次峰）、snr_db（主峰相对中位数噪声）。
+    """
     peak_ratio = float(peak_amp / (second + 1e-12))
 
-    noise_floor = float(np.median(X_band))
-    snr_db = float(20.0 * np.log10((peak_amp + 1e-12) / (noise_floor + 1e-12)))
+    # 标量运算用 math，避免 NumPy ufunc 的分派开销
+    snr_db = 20.0 * math.log10((peak_amp + 1e-12) / (noise_floor + 1e-12))
 
-    quality = {
+    return {
         "peak_amp": peak_amp,
         "second_peak_amp": second,
         "peak_ratio": peak_ratio,
         "snr_db": snr_db,
         "search_band": (fmin, fmax),
     }
-    return f_peak, quality
+
+
+def _resolve_search_band(
+    low_cut: float,
+    high_cut: float,
+    fs: int,
+    f_search_min: Optional[float],
+    f_search_max: Optional[float],
+) -> Tuple[float, float]:
+    """
+    主频搜索频段：默认在滤波带内找峰，稍微避开边界更稳；用户给的频段不合理时退回到滤波带。
+    """
+    band_low, band_high, _ = _clamp_band(low_cut, high_cut, fs)
+    fmin = float(f_search_min) if f_search_min is not None else max(band_low, 1e-3)
+    fmax = float(f_search_max) if f_search_max is not None else band_high
+    # 若用户给的搜索频段不合理，退回到 band
+    if (not math.isfinite(fmin)) or (not math.isfinite(fmax)) or (fmin <= 0) or (fmin >= fmax):
+        fmin, fmax = max(band_low, 1e-3), band_high
+    return fmin, fmax
+
+
+def _judge_abnormal(
+    A_pp_mm: float,
+    A_rms_mm: float,
+    A_pp_limit: Optional[float],
+    A_rms_limit: Optional[float],
+) -> bool:
+    """
+    异常判定（可扩展）：任一幅值超过给定阈值即为异常。
+    """
+    abnormal_flags = []
+    if A_pp_limit is not None:
+        abnormal_flags.append(A_pp_mm > float(A_pp_limit))
+    if A_rms_limit is not None:
+        abnormal_flags.append(A_rms_mm > float(A_rms_limit))
+
+    # 可选：若主峰显著性太低，标记“结果不可信”，这里不直接算异常，只写进 quality
+    # 你也可以把它纳入异常逻辑（取决于项目需求）
+    return any(abnormal_flags) if abnormal_flags else False
 
 
 def analyze_displacement_series(
@@ -376,20 +768,27 @@ def analyze_displacement_series(
     A_rms_limit: Optional[float] = None,
     # 频谱/主频参数
     window: str = "hann",
-    zero_pad_to: Optional[int] = None,
+    zero_pad_to: Optional[Union[int, str]] = None,
     # 主频搜索频段（默认与滤波频段一致，但建议略收紧）
     f_search_min: Optional[float] = None,
     f_search_max: Optional[float] = None,
     # 时间戳抖动阈值，超过则重采样
     jitter_ratio_tol: float = 0.02,
+    # 是否零相位滤波（False 时单次 sosfilt，约快一倍，见 filter_signal）
+    zero_phase: bool = True,
+    # 是否返回全频段频谱；False 时 f_spectrum/X_spectrum 只含主频搜索频段（省去段外频点的幅值计算）
+    full_spectrum: bool = True,
 ) -> AnalysisResult:
     """
     高层封装：直接从 DisplacementSeries 得到 AnalysisResult（工程增强版）。
     """
     fs = _validate_fs(disp_series.fs)
 
-    t_raw = _as_1d_float(disp_series.time_stamps)
-    x_raw = _sanitize_signal(disp_series.d_t_mm)
+    # 入口处一次性规范化为连续的 1D float64，内部步骤不再重复转换/复制
+    t_raw = np.ascontiguousarray(disp_series.time_stamps, dtype=np.float64).reshape(-1)
+    x_raw = _sanitize_signal(
+        np.ascontiguousarray(disp_series.d_t_mm, dtype=np.float64).reshape(-1)
+    )
 
     # 0) 检查/重采样
     t, x, resample_meta = _check_and_resample_if_needed(
@@ -407,40 +806,30 @@ def analyze_displacement_series(
         high_cut=high_cut,
         order=4,
         detrend=True,
+        zero_phase=zero_phase,
+        _already_clean=True,
     )
 
     # 2) 时域幅值
     A_pp_mm, A_rms_mm = calculate_time_domain_amp(x_filt)
 
-    # 3) 频谱（加窗 + 幅值校正）
+    # 3) 主频搜索频段
+    fmin, fmax = _resolve_search_band(low_cut, high_cut, fs, f_search_min, f_search_max)
+
+    # 4) 频谱（加窗 + 幅值校正）
     freqs, X_amp, spec_meta = calculate_fft_spectrum(
         d_t_mm_filtered=x_filt,
         fs=fs,
         window=window,
         zero_pad_to=zero_pad_to,
+        freq_clip=None if full_spectrum else (fmin, fmax),
+        _already_clean=True,
     )
 
-    # 4) 主频搜索频段
-    # 默认：在滤波带内找峰，稍微避开边界更稳
-    band_low, band_high, _ = _clamp_band(low_cut, high_cut, fs)
-    fmin = float(f_search_min) if f_search_min is not None else max(band_low, 1e-3)
-    fmax = float(f_search_max) if f_search_max is not None else band_high
-    # 若用户给的搜索频段不合理，退回到 band
-    if (not np.isfinite(fmin)) or (not np.isfinite(fmax)) or (fmin <= 0) or (fmin >= fmax):
-        fmin, fmax = max(band_low, 1e-3), band_high
-
     f_dom, quality = find_dominant_frequency(freqs, X_amp, fmin=fmin, fmax=fmax)
 
     # 5) 异常判定（可扩展）
-    abnormal_flags = []
-    if A_pp_limit is not None:
-        abnormal_flags.append(A_pp_mm > float(A_pp_limit))
-    if A_rms_limit is not None:
-        abnormal_flags.append(A_rms_mm > float(A_rms_limit))
-
-    # 可选：若主峰显著性太低，标记“结果不可信”，这里不直接算异常，只写进 quality
-    # 你也可以把它纳入异常逻辑（取决于项目需求）
-    is_abnormal = any(abnormal_flags) if abnormal_flags else False
+    is_abnormal = _judge_abnormal(A_pp_mm, A_rms_mm, A_pp_limit, A_rms_limit)
 
     preprocess_meta: Dict[str, Any] = {
         **resample_meta,
@@ -463,6 +852,273 @@ def analyze_displacement_series(
     )
 
 
+
+def _prepare_many(
+    series_list: List[DisplacementSeries],
+    jitter_ratio_tol: float,
+) -> Tuple[List[Tuple[np.ndarray, Dict[str, Any], int]], Dict[Tuple[int, int], List[int]]]:
+    """
+    批量分析的逐条预处理（规范化、NaN 补洞、重采样），并按 (fs, 长度) 分组。
+    返回 (prepared, groups)：prepared[k] = (x, resample_meta, n_raw)，groups 为 (fs, N) -> 下标列表。
+    """
+    prepared = []
+    groups: Dict[Tuple[int, int], List[int]] = {}
+    for k, disp_series in enumerate(series_list):
+        fs = _validate_fs(disp_series.fs)
+        t_raw = np.ascontiguousarray(disp_series.time_stamps, dtype=np.float64).reshape(-1)
+        x_raw = _sanitize_signal(
+            np.ascontiguousarray(disp_series.d_t_mm, dtype=np.float64).reshape(-1)
+        )
+        t, x, resample_meta = _check_and_resample_if_needed(
+            time_stamps=t_raw,
+            x=x_raw,
+            fs=fs,
+            jitter_ratio_tol=jitter_ratio_tol,
+        )
+        prepared.append((x, resample_meta, int(t_raw.size)))
+        groups.setdefault((fs, int(x.size)), []).append(k)
+    return prepared, groups
+
+
+def analyze_many(
+    series_list: List[DisplacementSeries],
+    low_cut: float,
+    high_cut: float,
+    A_pp_limit: Optional[float] = None,
+    A_rms_limit: Optional[float] = None,
+    window: str = "hann",
+    zero_pad_to: Optional[Union[int, str]] = None,
+    f_search_min: Optional[float] = None,
+    f_search_max: Optional[float] = None,
+    jitter_ratio_tol: float = 0.02,
+    zero_phase: bool = True,
+) -> List[AnalysisResult]:
+    """
+    批量版 analyze_displacement_series（多台风机/多个叶片），参数含义相同，结果与输入一一对应。
+
+    预处理（NaN 补洞、重采样）逐条进行；之后按 (fs, 长度) 分组，同组信号堆叠为 (F, N) 二维数组，
+    去趋势、sosfiltfilt 与 rfft 均沿 axis=-1 一次完成。结果与逐条调用一致（差异在浮点舍入以内）。
+    """
+    prepared, groups = _prepare_many(series_list, jitter_ratio_tol)
+
+    results: List[Optional[AnalysisResult]] = [None] * len(series_list)
+    order = 4
+    for (fs, N), idxs in groups.items():
+        if len(idxs) == 1 or N < 3:
+            # 单条或极短信号：走逐条路径即可
+            for k in idxs:
+                results[k] = analyze_displacement_series(
+                    series_list[k], low_cut, high_cut,
+                    A_pp_limit=A_pp_limit, A_rms_limit=A_rms_limit,
+                    window=window, zero_pad_to=zero_pad_to,
+                    f_search_min=f_search_min, f_search_max=f_search_max,
+                    jitter_ratio_tol=jitter_ratio_tol,
+                    zero_phase=zero_phase,
+                )
+            continue
+
+        X = np.stack([prepared[k][0] for k in idxs])  # (F, N)
+
+        # 1) 逐行闭式线性去趋势 + 带通滤波（沿 axis=-1 批量）
+        ic = np.arange(N, dtype=np.float64) - 0.5 * (N - 1)
+        slope = (X @ ic) * (12.0 / (N * (N * N - 1.0)))
+        X = X - X.mean(axis=1, keepdims=True) - slope[:, None] * ic
+        low, high, band_meta = _clamp_band(low_cut, high_cut, fs)
+        sos = _design_butter_sos(order, low, high, fs)
+        if zero_phase:
+            X_filt = signal.sosfiltfilt(sos, X, axis=-1)
+            filter_name = "butterworth_bandpass_sosfiltfilt"
+        else:
+            zi = _sosfilt_zi(order, low, high, fs)[:, None, :] * X[:, 0][None, :, None]
+            X_filt, _ = signal.sosfilt(sos, X, axis=-1, zi=zi)
+            filter_name = "butterworth_bandpass_sosfilt"
+
+        # 2) 时域幅值
+        A_pp = np.ptp(X_filt, axis=1)
+        A_rms = np.sqrt(np.einsum("ij,ij->i", X_filt, X_filt) / N)
+
+        # 3) 频谱：一次批量 rfft
+        w, window_name, cg = _get_window(window, N)
+        nfft = _choose_nfft(N, zero_pad_to)
+        X_amp = _abs_scaled(sp_fft.rfft(X_filt * w, n=nfft, axis=-1, workers=-1), 2.0 / (N * cg))
+        X_amp[:, 0] /= 2.0
+        if nfft % 2 == 0 and X_amp.shape[1] > 1:
+            X_amp[:, -1] /= 2.0
+        freqs = _rfftfreq(nfft, fs)
+
+        filter_meta = {
+            "filter": filter_name,
+            "order": order,
+            "detrend": True,
+            "zero_phase": zero_phase,
+            **band_meta,
+        }
+        spec_meta = {
+            "window": window_name,
+            "coherent_gain": cg,
+            "n": N,
+            "nfft": nfft,
+            "fs": fs,
+        }
+        fmin, fmax = _resolve_search_band(low_cut, high_cut, fs, f_search_min, f_search_max)
+
+        # 4) 逐行主频搜索与结果封装
+        for r, k in enumerate(idxs):
+            f_dom, quality = find_dominant_frequency(freqs, X_amp[r], fmin=fmin, fmax=fmax)
+            A_pp_mm, A_rms_mm = float(A_pp[r]), float(A_rms[r])
+            x, resample_meta, n_raw = prepared[k]
+            results[k] = AnalysisResult(
+                A_pp_mm=A_pp_mm,
+                A_rms_mm=A_rms_mm,
+                f_dominant_hz=f_dom,
+                f_spectrum=freqs,
+                X_spectrum=X_amp[r],
+                is_abnormal=_judge_abnormal(A_pp_mm, A_rms_mm, A_pp_limit, A_rms_limit),
+                fan_id=series_list[k].fan_id,
+                quality=quality,
+                preprocess_meta={
+                    **resample_meta,
+                    **filter_meta,
+                    **spec_meta,
+                    "n_raw": n_raw,
+                    "n_used": N,
+                },
+            )
+
+    return results
+
+
+def analyze_many_gpu(
+    series_list: List[DisplacementSeries],
+    low_cut: float,
+    high_cut: float,
+    A_pp_limit: Optional[float] = None,
+    A_rms_limit: Optional[float] = None,
+    window: str = "hann",
+    zero_pad_to: Optional[Union[int, str]] = None,
+    f_search_min: Optional[float] = None,
+    f_search_max: Optional[float] = None,
+    jitter_ratio_tol: float = 0.02,
+    zero_phase: bool = True,
+) -> List[AnalysisResult]:
+    """
+    analyze_many 的 GPU 版本（需安装 CuPy）：每组 (F, N) 信号只上传一次，
+    去趋势、滤波、加窗、rfft 与频段内峰值统计都在 GPU 上完成，只把幅度谱与标量结果拷回主机。
+    未安装 CuPy 时直接退回 analyze_many。
+    """
+    kwargs = dict(
+        A_pp_limit=A_pp_limit, A_rms_limit=A_rms_limit,
+        window=window, zero_pad_to=zero_pad_to,
+        f_search_min=f_search_min, f_search_max=f_search_max,
+        jitter_ratio_tol=jitter_ratio_tol, zero_phase=zero_phase,
+    )
+    if not CUPY_AVAILABLE:
+        return analyze_many(series_list, low_cut, high_cut, **kwargs)
+
+    prepared, groups = _prepare_many(series_list, jitter_ratio_tol)
+
+    results: List[Optional[AnalysisResult]] = [None] * len(series_list)
+    order = 4
+    for (fs, N), idxs in groups.items():
+        if len(idxs) == 1 or N < 3:
+            for k in idxs:
+                results[k] = analyze_displacement_series(series_list[k], low_cut, high_cut, **kwargs)
+            continue
+
+        X = cp.asarray(np.stack([prepared[k][0] for k in idxs]))  # (F, N)，一次上传
+
+        # 1) 逐行闭式线性去趋势 + 带通滤波（SOS 在 CPU 上设计并缓存）
+        ic = cp.arange(N, dtype=cp.float64) - 0.5 * (N - 1)
+        slope = (X @ ic) * (12.0 / (N * (N * N - 1.0)))
+        X = X - X.mean(axis=1, keepdims=True) - slope[:, None] * ic
+        low, high, band_meta = _clamp_band(low_cut, high_cut, fs)
+        sos_host = _design_butter_sos(order, low, high, fs)
+        sos = cp.asarray(sos_host)
+        if zero_phase:
+            X_filt = cp_signal.sosfiltfilt(sos, X, axis=-1)
+            filter_name = "butterworth_bandpass_sosfiltfilt"
+        else:
+            zi = cp.asarray(_sosfilt_zi(order, low, high, fs))[:, None, :] * X[:, 0][None, :, None]
+            X_filt, _ = cp_signal.sosfilt(sos, X, axis=-1, zi=zi)
+            filter_name = "butterworth_bandpass_sosfilt"
+
+        # 2) 时域幅值
+        A_pp = cp.ptp(X_filt, axis=1)
+        A_rms = cp.sqrt((X_filt * X_filt).mean(axis=1))
+
+        # 3) 频谱：一次批量 rfft
+        w_host, window_name, cg = _get_window(window, N)
+        nfft = _choose_nfft(N, zero_pad_to)
+        X_amp = cp.abs(cp.fft.rfft(X_filt * cp.asarray(w_host), n=nfft, axis=-1))
+        X_amp *= 2.0 / (N * cg)
+        X_amp[:, 0] /= 2.0
+        if nfft % 2 == 0 and X_amp.shape[1] > 1:
+            X_amp[:, -1] /= 2.0
+        freqs = _rfftfreq(nfft, fs)
+
+        # 4) 频段内峰值统计（设备端）：主峰下标、前两名、中位数
+        fmin, fmax = _resolve_search_band(low_cut, high_cut, fs, f_search_min, f_search_max)
+        i0 = int(np.searchsorted(freqs, fmin, side="left"))
+        i1 = int(np.searchsorted(freqs, fmax, side="right"))
+        stats = None
+        if i1 > i0:
+            X_band = X_amp[:, i0:i1]
+            idx = cp.argmax(X_band, axis=1)
+            peak = X_band.max(axis=1)
+            if X_band.shape[1] >= 2:
+                second = cp.partition(X_band, -2, axis=1)[:, -2]
+            else:
+                second = cp.zeros_like(peak)
+            noise = cp.median(X_band, axis=1)
+            stats = [cp.asnumpy(a) for a in (idx, peak, second, noise)]
+
+        A_pp, A_rms, X_amp = cp.asnumpy(A_pp), cp.asnumpy(A_rms), cp.asnumpy(X_amp)
+
+        filter_meta = {
+            "filter": filter_name,
+            "order": order,
+            "detrend": True,
+            "zero_phase": zero_phase,
+            **band_meta,
+        }
+        spec_meta = {
+            "window": window_name,
+            "coherent_gain": cg,
+            "n": N,
+            "nfft": nfft,
+            "fs": fs,
+        }
+
+        for r, k in enumerate(idxs):
+            if stats is None:
+                f_dom, quality = 0.0, {"note": "no_bins_in_search_band", "fmin": fmin, "fmax": fmax}
+            else:
+                idx_h, peak_h, second_h, noise_h = stats
+                f_dom = float(freqs[i0 + int(idx_h[r])])
+                quality = _peak_quality(float(peak_h[r]), float(second_h[r]), float(noise_h[r]), fmin, fmax)
+            A_pp_mm, A_rms_mm = float(A_pp[r]), float(A_rms[r])
+            x, resample_meta, n_raw = prepared[k]
+            results[k] = AnalysisResult(
+                A_pp_mm=A_pp_mm,
+                A_rms_mm=A_rms_mm,
+                f_dominant_hz=f_dom,
+                f_spectrum=freqs,
+                X_spectrum=X_amp[r],
+                is_abnormal=_judge_abnormal(A_pp_mm, A_rms_mm, A_pp_limit, A_rms_limit),
+                fan_id=series_list[k].fan_id,
+                quality=quality,
+                preprocess_meta={
+                    **resample_meta,
+                    **filter_meta,
+                    **spec_meta,
+                    "n_raw": n_raw,
+                    "n_used": N,
+                },
+            )
+
+    return results
+
+
 # =========================
 # 本地简单测试（示例）
 # =========================
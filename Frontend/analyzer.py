@@ -5,15 +5,16 @@
 
 import streamlit as st
 import numpy as np
-import tempfile
 import os
+import re
+import hashlib
+import collections
 import sys
 import time
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
 import matplotlib
-matplotlib.use('Agg')  # 使用非交互式后端
-import matplotlib.pyplot as plt
-from matplotlib import font_manager
+matplotlib.use('Agg', force=True)  # 使用非交互式后端；Figure / font_manager 在首次绘图时才导入
 import io
 
 # 添加Backend路径
@@ -33,17 +34,183 @@ try:
 except ImportError as e:
     st.warning(f"⚠️ Backend图像分析模块导入失败: {e}")
 
+@st.cache_resource
+def _load_backend_signal():
+    """
+    加载信号分析模块并启动内核预热，每个进程只执行一次；
+    之后的脚本重跑直接返回缓存的 (DisplacementSeries, analyze_displacement_series)。
+    """
+    import signal_analysis
+    # 后台预编译 Numba 内核，首次分析不再等待 JIT
+    signal_analysis.warmup_kernels()
+    return signal_analysis.DisplacementSeries, signal_analysis.analyze_displacement_series
+
 # 导入信号分析模块
 try:
-    import signal_analysis
-    SignalDisplacementSeries = signal_analysis.DisplacementSeries
-    analyze_displacement_series = signal_analysis.analyze_displacement_series
+    SignalDisplacementSeries, analyze_displacement_series = _load_backend_signal()
     SIGNAL_AVAILABLE = True
 except ImportError as e:
     st.warning(f"⚠️ Backend信号分析模块导入失败: {e}")
 except Exception as e:
     st.warning(f"⚠️ 加载信号分析模块时发生错误: {e}")
 
+def _clip_spectrum(f, X, f_max):
+    """
+    频谱按显示上限截取（f 升序，searchsorted 定位），只把可见部分交给 matplotlib，
+    而不是绘制全频段后再用 set_xlim 隐藏。
+    """
+    idx = int(np.searchsorted(f, f_max, side='right'))
+    return f[:idx], X[:idx]
+
+# 常见系统自带 / 项目可能附带的中文字体（按优先级）
+CJK_FONT_CANDIDATES = [
+    'C:/Windows/Fonts/msyh.ttc',
+    'C:/Windows/Fonts/simhei.ttf',
+    '/System/Library/Fonts/PingFang.ttc',
+    '/usr/share/fonts/opentype/noto/NotoSansCJK-Regular.ttc',
+    '/usr/share/fonts/noto-cjk/NotoSansCJK-Regular.ttc',
+    '/usr/share/fonts/truetype/wqy/wqy-microhei.ttc',
+]
+
+@st.cache_resource
+def _setup_cjk_font():
+    """
+    每个进程只注册一次中文字体并设为默认 sans-serif，图中的中文标签不再逐次回退查找字体。
+    返回所用字体名；未找到任何候选字体时返回 None（保持 matplotlib 默认设置）。
+    """
+    from matplotlib import font_manager
+    
+    for path in CJK_FONT_CANDIDATES:
+        if os.path.exists(path):
+            font_manager.fontManager.addfont(path)
+            name = font_manager.FontProperties(fname=path).get_name()
+            matplotlib.rcParams['font.sans-serif'] = [name] + list(matplotlib.rcParams['font.sans-serif'])
+            matplotlib.rcParams['font.family'] = 'sans-serif'
+            matplotlib.rcParams['axes.unicode_minus'] = False
+            return name
+    return None
+
+def _new_result_figure():
+    """
+    新建 4x1 结果图 (fig, axes)：上两行为切向/轴向时域，下两行为切向/轴向频谱，
+    一次渲染、一次 PNG 编码与传输。两行时域、两行频谱分别共享 x 轴，省去重复的刻度计算。
+    每次渲染都新建 Figure：Streamlit 的各个会话在不同线程中并发执行脚本，共享的图对象会互相覆盖；
+    渲染结果以 PNG 缓存在 session_state 中，只有结果或显示参数变化时才重新绘制。
+    直接使用 Figure 而非 pyplot，避免 pyplot 全局状态（Figure 不注册到 pyplot，无需手动关闭）。
+    首次调用时才导入 matplotlib 的绘图模块并注册中文字体，未显示结果的页面加载不承担这部分开销。
+    """
+    from matplotlib.figure import Figure
+    
+    _setup_cjk_font()
+    fig = Figure(figsize=(12, 16))
+    fig.patch.set_facecolor('white')
+    axes = fig.subplots(4, 1)
+    axes[1].sharex(axes[0])
+    axes[3].sharex(axes[2])
+    return fig, axes
+
+def _decimate(x, y, n=2000):
+    """
+    绘图前等间隔抽取至约 n 个点，长序列不再把每个采样点都交给 Agg 光栅化。
+    仅用于显示，分析指标仍基于完整序列计算。
+    等间隔抽取可能跳过窄峰，只用于时域曲线；频谱由 _clip_spectrum 截取后完整绘制，保证主频峰可见。
+    """
+    if len(x) <= n:
+        return x, y
+    idx = np.linspace(0, len(x) - 1, n).astype(np.int64)
+    return x[idx], y[idx]
+
+def _cached_figure_png(state_key, cache_key):
+    """
+    取出 session_state 中已渲染的结果图 PNG；结果 / 显示参数变化（cache_key 不同）时返回 None。
+    """
+    cached = st.session_state.get(state_key)
+    if cached is not None and cached[0] == cache_key:
+        return cached[1]
+    return None
+
+def _store_figure_png(fig, state_key, cache_key):
+    """
+    将结果图渲染为 PNG 字节并存入 session_state，之后的页面重跑直接 st.image 显示，不再重绘。
+    """
+    buf = io.BytesIO()
+    fig.savefig(buf, format='png', dpi=100, bbox_inches='tight')
+    png = buf.getvalue()
+    st.session_state[state_key] = (cache_key, png)
+    return png
+
+@st.cache_data(show_spinner=False, max_entries=8)
+def _cached_image_analysis(file_digest, _npz_file):
+    """
+    图像分析结果按上传文件内容 (sha256) 缓存：重复点击“开始分析”或只修改信号参数时不再重跑跟踪。
+    _npz_file 以下划线开头，不参与缓存键的哈希。
+    """
+    return run_image_analysis_from_npz(_npz_file)
+
+@st.cache_data(show_spinner=False, max_entries=32)
+def _cached_signal_analysis(file_digest, low_cut, high_cut, f_search_min, f_search_max, A_pp_limit, A_rms_limit, _image_result):
+    """
+    切向 / 轴向信号分析结果按 (文件内容, 分析参数) 缓存，返回 (signal_result_flap, signal_result_edge)。
+    _image_result 由 file_digest 唯一确定，不参与哈希。
+    """
+    # 信号分析内核按连续 float64 处理：在此统一一次，后端直接走零拷贝快速路径
+    # （不降为 float32：后端会再升回 float64，反而多一次转换拷贝）
+    # 两个方向共用同一个时间戳数组，后端只读取不修改
+    ts = np.ascontiguousarray(_image_result.time_stamps, dtype=np.float64)
+    d_flap = np.ascontiguousarray(_image_result.d_flapwise_mm, dtype=np.float64)
+    d_edge = np.ascontiguousarray(_image_result.d_edgewise_mm, dtype=np.float64)
+    fs = int(_image_result.fs)
+    
+    signal_disp_flap = SignalDisplacementSeries(
+        time_stamps=ts,
+        d_t_mm=d_flap,
+        fs=fs,
+        fan_id="fan_001"
+    )
+    
+    signal_disp_edge = SignalDisplacementSeries(
+        time_stamps=ts,
+        d_t_mm=d_edge,
+        fs=fs,
+        fan_id="fan_001"
+    )
+    
+    signal_params = dict(
+        low_cut=low_cut,
+        high_cut=high_cut,
+        f_search_min=f_search_min,
+        f_search_max=f_search_max,
+        A_pp_limit=A_pp_limit,
+        A_rms_limit=A_rms_limit
+    )
+    
+    # 滤波 / FFT 在 SciPy/NumPy 的 C 代码中释放 GIL，两个方向用线程即可并行
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        future_flap = executor.submit(analyze_displacement_series, disp_series=signal_disp_flap, **signal_params)
+        future_edge = executor.submit(analyze_displacement_series, disp_series=signal_disp_edge, **signal_params)
+        signal_result_flap = future_flap.result()
+        signal_result_edge = future_edge.result()
+    
+    return signal_result_flap, signal_result_edge
+
+@st.cache_data(show_spinner=False, max_entries=16)
+def _make_csv(f_flap, pp_flap, rms_flap, ab_flap, f_edge, pp_edge, rms_edge, ab_edge):
+    """
+    统计数据 CSV（utf-8-sig 编码字节），只以标量指标为缓存键，重复点击导出时直接返回。
+    """
+    import pandas as pd
+    
+    data = {
+        '方向': ['切向', '轴向'],
+        '主频_Hz': [f_flap, f_edge],
+        '峰峰值_mm': [pp_flap, pp_edge],
+        'RMS_mm': [rms_flap, rms_edge],
+        '异常状态': [ab_flap, ab_edge]
+    }
+    
+    df = pd.DataFrame(data)
+    return df.to_csv(index=False).encode('utf-8-sig')
+
 # --- 页面配置 ---
 st.set_page_config(
     page_title="WTG Blade Vibration Analyzer",
@@ -53,7 +220,7 @@ st.set_page_config(
 )
 
 # --- 自定义 CSS 样式 ---
-st.markdown("""
+CUSTOM_CSS = """
 <style>
     .main {
         background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
@@ -81,7 +248,17 @@ st.markdown("""
         font-weight: bold;
     }
 </style>
-""", unsafe_allow_html=True)
+"""
+
+@st.cache_resource
+def _minified_css():
+    """
+    压缩空白后的样式块，只计算一次，减少每次重跑通过 websocket 发送的字节数。
+    注意：Streamlit 每次重跑都会清除未重新输出的元素，因此样式仍需每次输出，不能只发送一次。
+    """
+    return re.sub(r'\s*([{}:;,])\s*', r'\1', re.sub(r'\s+', ' ', CUSTOM_CSS)).strip()
+
+st.markdown(_minified_css(), unsafe_allow_html=True)
 
 # --- 主标题 ---
 st.title("📊 风机叶片振动分析系统")
@@ -102,7 +279,9 @@ with st.sidebar:
             st.error("信号分析模块不可用")
     
     st.markdown("---")
-    
+
+# 参数放在表单中：修改数值不再逐次触发整页重跑，点击"应用参数"后一并生效
+with st.sidebar.form("analysis_params"):
     # 信号分析参数
     st.subheader("📈 信号分析参数")
     
@@ -148,25 +327,28 @@ with st.sidebar:
     
     enable_threshold = st.checkbox("启用异常检测", value=False)
     
-    if enable_threshold:
-        A_pp_limit = st.number_input(
-            "峰峰值阈值 (mm)",
-            min_value=0.0,
-            value=10.0,
-            step=0.1,
-            help="超过此值将标记为异常"
-        )
-        
-        A_rms_limit = st.number_input(
-            "RMS阈值 (mm)",
-            min_value=0.0,
-            value=5.0,
-            step=0.1,
-            help="超过此值将标记为异常"
-        )
-    else:
-        A_pp_limit = None
-        A_rms_limit = None
+    # 表单内勾选不会触发重跑，阈值输入框始终显示，未启用时不参与分析
+    A_pp_limit = st.number_input(
+        "峰峰值阈值 (mm)",
+        min_value=0.0,
+        value=10.0,
+        step=0.1,
+        help="超过此值将标记为异常"
+    )
+    
+    A_rms_limit = st.number_input(
+        "RMS阈值 (mm)",
+        min_value=0.0,
+        value=5.0,
+        step=0.1,
+        help="超过此值将标记为异常"
+    )
+    
+    st.form_submit_button("应用参数", use_container_width=True)
+
+if not enable_threshold:
+    A_pp_limit = None
+    A_rms_limit = None
 
 # --- 主界面 ---
 
@@ -197,76 +379,54 @@ if uploaded_file is not None:
                 status_text = st.empty()
                 log_container = st.empty()
                 
-                logs = []
+                logs = collections.deque(maxlen=10)  # 只保留并显示最后10条
+                last_log_flush = [0.0]
                 
-                def add_log(message):
+                def flush_logs():
+                    log_container.text("\n".join(logs))
+                    last_log_flush[0] = time.monotonic()
+                
+                def add_log(message, force=False):
                     logs.append(f"[{datetime.now().strftime('%H:%M:%S')}] {message}")
-                    log_container.text("\n".join(logs[-10:]))  # 只显示最后10条
+                    # 合并刷新：最多每 0.25 秒向浏览器发送一次日志更新
+                    if force or time.monotonic() - last_log_flush[0] > 0.25:
+                        flush_logs()
                 
                 def update_progress(progress, message):
                     progress_bar.progress(progress)
                     status_text.text(message)
                 
                 try:
-                    # 步骤1: 保存上传的文件
-                    add_log("正在保存上传的文件...")
-                    tfile = tempfile.NamedTemporaryFile(delete=False, suffix='.npz')
-                    tfile.write(uploaded_file.read())
-                    npz_path = tfile.name
-                    tfile.close()
-                    add_log(f"文件已保存: {npz_path}")
+                    # 步骤1: 直接在内存中读取上传的文件（UploadedFile 本身即 BytesIO，不再写临时文件）
+                    add_log(f"读取上传的文件: {uploaded_file.name}")
+                    file_digest = hashlib.sha256(uploaded_file.getbuffer()).hexdigest()
                     
                     # 步骤2: 图像分析
-                    add_log("开始图像分析...")
+                    # 耗时阶段开始前强制刷新，确保界面显示当前步骤
+                    add_log("开始图像分析...", force=True)
                     update_progress(0.2, "图像分析中...")
                     start_time = time.time()
                     
-                    image_result = run_image_analysis_from_npz(npz_path)
+                    image_result = _cached_image_analysis(file_digest, uploaded_file)
                     
                     image_time = time.time() - start_time
                     add_log(f"✅ 图像分析完成！耗时: {image_time:.1f}秒")
                     add_log(f"   采样率: {image_result.fs} Hz")
                     add_log(f"   数据长度: {len(image_result.time_stamps)} 帧")
                     
-                    # 步骤3: 信号分析（切向方向）
-                    add_log("开始信号分析（切向方向）...")
+                    # 步骤3: 信号分析（切向 / 轴向两个方向相互独立，并行执行）
+                    add_log("开始信号分析（切向、轴向方向并行）...", force=True)
                     update_progress(0.6, "信号分析中...")
                     
-                    signal_disp_flap = SignalDisplacementSeries(
-                        time_stamps=image_result.time_stamps,
-                        d_t_mm=image_result.d_flapwise_mm,
-                        fs=int(image_result.fs),
-                        fan_id="fan_001"
-                    )
-                    
-                    signal_result_flap = analyze_displacement_series(
-                        disp_series=signal_disp_flap,
-                        low_cut=low_cut,
-                        high_cut=high_cut,
-                        f_search_min=f_search_min,
-                        f_search_max=f_search_max,
-                        A_pp_limit=A_pp_limit,
-                        A_rms_limit=A_rms_limit
-                    )
-                    
-                    # 信号分析（轴向方向）
-                    add_log("开始信号分析（轴向方向）...")
-                    
-                    signal_disp_edge = SignalDisplacementSeries(
-                        time_stamps=image_result.time_stamps,
-                        d_t_mm=image_result.d_edgewise_mm,
-                        fs=int(image_result.fs),
-                        fan_id="fan_001"
-                    )
-                    
-                    signal_result_edge = analyze_displacement_series(
-                        disp_series=signal_disp_edge,
-                        low_cut=low_cut,
-                        high_cut=high_cut,
-                        f_search_min=f_search_min,
-                        f_search_max=f_search_max,
-                        A_pp_limit=A_pp_limit,
-                        A_rms_limit=A_rms_limit
+                    signal_result_flap, signal_result_edge = _cached_signal_analysis(
+                        file_digest,
+                        low_cut,
+                        high_cut,
+                        f_search_min,
+                        f_search_max,
+                        A_pp_limit,
+                        A_rms_limit,
+                        image_result
                     )
                     
                     signal_time = time.time() - start_time - image_time
@@ -276,20 +436,21 @@ if uploaded_file is not None:
                     st.session_state.image_result = image_result
                     st.session_state.signal_result_flap = signal_result_flap
                     st.session_state.signal_result_edge = signal_result_edge
+                    st.session_state.result_key = (file_digest, low_cut, high_cut, f_search_min, f_search_max, A_pp_limit, A_rms_limit)
                     st.session_state.analysis_complete = True
                     
                     update_progress(1.0, "分析完成！")
                     add_log("🎉 所有分析完成！")
                     
                     total_time = time.time() - start_time
-                    add_log(f"总耗时: {total_time:.1f}秒")
+                    add_log(f"总耗时: {total_time:.1f}秒", force=True)
                     
                     st.success("✅ 分析完成！")
                     st.balloons()
                     
                 except ValueError as e:
                     error_msg = str(e)
-                    add_log(f"❌ 分析失败: {error_msg}")
+                    add_log(f"❌ 分析失败: {error_msg}", force=True)
                     
                     # 提供针对性的错误提示
                     if "AruCo标记物检测失败" in error_msg or "Signal contains no finite values" in error_msg:
@@ -348,16 +509,10 @@ if uploaded_file is not None:
                         st.exception(e)
                         
                 except Exception as e:
-                    add_log(f"❌ 分析失败: {str(e)}")
+                    add_log(f"❌ 分析失败: {str(e)}", force=True)
                     st.error(f"❌ 分析过程中发生错误: {str(e)}")
                     with st.expander("🔍 查看详细错误信息"):
                         st.exception(e)
-                finally:
-                    # 清理临时文件
-                    try:
-                        os.unlink(npz_path)
-                    except (PermissionError, FileNotFoundError):
-                        pass
 
 # --- 结果显示 ---
 if st.session_state.get('analysis_complete', False):
@@ -403,61 +558,53 @@ if st.session_state.get('analysis_complete', False):
     if signal_result_flap.is_abnormal or signal_result_edge.is_abnormal:
         st.warning("⚠️ 检测到异常振动！")
     
-    # 时域图
-    st.subheader("📈 时域分析")
-    
-    fig_time, axes = plt.subplots(2, 1, figsize=(12, 8))
-    fig_time.patch.set_facecolor('white')
-    
-    # 切向位移
-    axes[0].plot(image_result.time_stamps, image_result.d_flapwise_mm, 'b-', linewidth=1.5, label='切向位移')
-    axes[0].set_xlabel('时间 (s)', fontsize=12)
-    axes[0].set_ylabel('位移 (mm)', fontsize=12)
-    axes[0].set_title('切向位移时间序列', fontsize=14, fontweight='bold')
-    axes[0].grid(True, alpha=0.3)
-    axes[0].legend()
-    
-    # 轴向位移
-    axes[1].plot(image_result.time_stamps, image_result.d_edgewise_mm, 'r-', linewidth=1.5, label='轴向位移')
-    axes[1].set_xlabel('时间 (s)', fontsize=12)
-    axes[1].set_ylabel('位移 (mm)', fontsize=12)
-    axes[1].set_title('轴向位移时间序列', fontsize=14, fontweight='bold')
-    axes[1].grid(True, alpha=0.3)
-    axes[1].legend()
-    
-    plt.tight_layout()
-    st.pyplot(fig_time)
-    plt.close(fig_time)
-    
-    # 频域图
-    st.subheader("🔊 频域分析")
-    
-    fig_freq, axes = plt.subplots(2, 1, figsize=(12, 8))
-    fig_freq.patch.set_facecolor('white')
-    
-    # 切向频谱
-    axes[0].plot(signal_result_flap.f_spectrum, signal_result_flap.X_spectrum, 'b-', linewidth=1.5, label='频谱')
-    axes[0].axvline(signal_result_flap.f_dominant_hz, color='red', linestyle='--', linewidth=2, label=f'主频: {signal_result_flap.f_dominant_hz:.3f} Hz')
-    axes[0].set_xlabel('频率 (Hz)', fontsize=12)
-    axes[0].set_ylabel('幅值 (mm)', fontsize=12)
-    axes[0].set_title('切向位移频谱', fontsize=14, fontweight='bold')
-    axes[0].grid(True, alpha=0.3)
-    axes[0].legend()
-    axes[0].set_xlim([0, min(high_cut * 1.5, signal_result_flap.f_spectrum.max())])
-    
-    # 轴向频谱
-    axes[1].plot(signal_result_edge.f_spectrum, signal_result_edge.X_spectrum, 'r-', linewidth=1.5, label='频谱')
-    axes[1].axvline(signal_result_edge.f_dominant_hz, color='blue', linestyle='--', linewidth=2, label=f'主频: {signal_result_edge.f_dominant_hz:.3f} Hz')
-    axes[1].set_xlabel('频率 (Hz)', fontsize=12)
-    axes[1].set_ylabel('幅值 (mm)', fontsize=12)
-    axes[1].set_title('轴向位移频谱', fontsize=14, fontweight='bold')
-    axes[1].grid(True, alpha=0.3)
-    axes[1].legend()
-    axes[1].set_xlim([0, min(high_cut * 1.5, signal_result_edge.f_spectrum.max())])
-    
-    plt.tight_layout()
-    st.pyplot(fig_freq)
-    plt.close(fig_freq)
+    # 时域 / 频域图（同一张图，频谱显示范围取决于当前侧边栏的高截止频率）
+    st.subheader("📈 时域与频域分析")
+    
+    plot_key = (st.session_state.result_key, high_cut)
+    result_png = _cached_figure_png('result_png', plot_key)
+    if result_png is None:
+        fig, axes = _new_result_figure()
+        
+        # 切向位移（长序列线条预先光栅化，导出矢量格式时也不逐段描边）
+        axes[0].plot(*_decimate(image_result.time_stamps, image_result.d_flapwise_mm), 'b-', linewidth=1.5, label='切向位移', rasterized=True)
+        axes[0].set_xlabel('时间 (s)', fontsize=12)
+        axes[0].set_ylabel('位移 (mm)', fontsize=12)
+        axes[0].set_title('切向位移时间序列', fontsize=14, fontweight='bold')
+        axes[0].grid(True, alpha=0.3)
+        axes[0].legend()
+        
+        # 轴向位移
+        axes[1].plot(*_decimate(image_result.time_stamps, image_result.d_edgewise_mm), 'r-', linewidth=1.5, label='轴向位移', rasterized=True)
+        axes[1].set_xlabel('时间 (s)', fontsize=12)
+        axes[1].set_ylabel('位移 (mm)', fontsize=12)
+        axes[1].set_title('轴向位移时间序列', fontsize=14, fontweight='bold')
+        axes[1].grid(True, alpha=0.3)
+        axes[1].legend()
+        
+        # 切向频谱
+        axes[2].plot(*_clip_spectrum(signal_result_flap.f_spectrum, signal_result_flap.X_spectrum, high_cut * 1.5), 'b-', linewidth=1.5, label='频谱')
+        axes[2].axvline(signal_result_flap.f_dominant_hz, color='red', linestyle='--', linewidth=2, label=f'主频: {signal_result_flap.f_dominant_hz:.3f} Hz')
+        axes[2].set_xlabel('频率 (Hz)', fontsize=12)
+        axes[2].set_ylabel('幅值 (mm)', fontsize=12)
+        axes[2].set_title('切向位移频谱', fontsize=14, fontweight='bold')
+        axes[2].grid(True, alpha=0.3)
+        axes[2].legend()
+        axes[2].set_xlim([0, min(high_cut * 1.5, signal_result_flap.f_spectrum[-1])])
+        
+        # 轴向频谱
+        axes[3].plot(*_clip_spectrum(signal_result_edge.f_spectrum, signal_result_edge.X_spectrum, high_cut * 1.5), 'r-', linewidth=1.5, label='频谱')
+        axes[3].axvline(signal_result_edge.f_dominant_hz, color='blue', linestyle='--', linewidth=2, label=f'主频: {signal_result_edge.f_dominant_hz:.3f} Hz')
+        axes[3].set_xlabel('频率 (Hz)', fontsize=12)
+        axes[3].set_ylabel('幅值 (mm)', fontsize=12)
+        axes[3].set_title('轴向位移频谱', fontsize=14, fontweight='bold')
+        axes[3].grid(True, alpha=0.3)
+        axes[3].legend()
+        axes[3].set_xlim([0, min(high_cut * 1.5, signal_result_edge.f_spectrum[-1])])
+        
+        fig.tight_layout()
+        result_png = _store_figure_png(fig, 'result_png', plot_key)
+    st.image(result_png, use_container_width=True)
     
     # 详细统计信息
     st.subheader("📋 详细统计信息")
@@ -488,18 +635,12 @@ if st.session_state.get('analysis_complete', False):
     
     # 导出为CSV
     if st.button("📥 导出统计数据为CSV"):
-        import pandas as pd
-        
-        data = {
-            '方向': ['切向', '轴向'],
-            '主频_Hz': [signal_result_flap.f_dominant_hz, signal_result_edge.f_dominant_hz],
-            '峰峰值_mm': [signal_result_flap.A_pp_mm, signal_result_edge.A_pp_mm],
-            'RMS_mm': [signal_result_flap.A_rms_mm, signal_result_edge.A_rms_mm],
-            '异常状态': [signal_result_flap.is_abnormal, signal_result_edge.is_abnormal]
-        }
-        
-        df = pd.DataFrame(data)
-        csv = df.to_csv(index=False).encode('utf-8-sig')
+        csv = _make_csv(
+            float(signal_result_flap.f_dominant_hz), float(signal_result_flap.A_pp_mm),
+            float(signal_result_flap.A_rms_mm), bool(signal_result_flap.is_abnormal),
+            float(signal_result_edge.f_dominant_hz), float(signal_result_edge.A_pp_mm),
+            float(signal_result_edge.A_rms_mm), bool(signal_result_edge.is_abnormal)
+        )
         
         st.download_button(
             label="⬇️ 下载CSV文件",
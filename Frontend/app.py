@@ -2,9 +2,15 @@ import streamlit as st
 import numpy as np
 import tempfile
 import os
+import hashlib
+import re
+import collections
+import shutil
 import time
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from processor import VideoProcessor
+from processor import VideoProcessor, read_first_frame
 import io
 
 # --- 页面配置 ---
@@ -16,7 +22,7 @@ st.set_page_config(
 )
 
 # --- 自定义 CSS 样式 ---
-st.markdown("""
+CUSTOM_CSS = """
 <style>
     /* 全局样式 */
     .main {
@@ -99,7 +105,18 @@ st.markdown("""
         box-shadow: 0 4px 15px rgba(0, 0, 0, 0.1);
     }
 </style>
-""", unsafe_allow_html=True)
+"""
+
+@st.cache_resource
+def _minified_css():
+    """
+    去掉注释并压缩空白后的样式块，只计算一次，减少每次重跑通过 websocket 发送的字节数。
+    注意：Streamlit 每次重跑都会清除未重新输出的元素，因此样式仍需每次输出，不能只发送一次。
+    """
+    css = re.sub(r'/\*.*?\*/', '', CUSTOM_CSS, flags=re.S)
+    return re.sub(r'\s*([{}:;,])\s*', r'\1', re.sub(r'\s+', ' ', css)).strip()
+
+st.markdown(_minified_css(), unsafe_allow_html=True)
 
 # --- 重置函数 ---
 def reset_processing_state():
@@ -108,24 +125,162 @@ def reset_processing_state():
         del st.session_state.processing_complete
     if 'processed_file_name' in st.session_state:
         del st.session_state.processed_file_name
-    if 'frames' in st.session_state:
-        del st.session_state.frames
+    for key in ('n_frames', 'frame_shape'):
+        if key in st.session_state:
+            del st.session_state[key]
     if 'fps' in st.session_state:
         del st.session_state.fps
     if 'npz_file_path' in st.session_state:
         del st.session_state.npz_file_path
     st.rerun()
 
+# --- 处理器 ---
+@st.cache_resource
+def get_processor():
+    """
+    每个进程只创建一次 VideoProcessor（含硬件解码设备探测），之后的脚本重跑与多次上传直接复用。
+    实例只保存构造参数与探测结果，process_video 的逐次状态都在局部变量中，可供多个会话同时调用。
+    """
+    return VideoProcessor()
+
+# --- 后台 I/O ---
+@st.cache_resource
+def _get_io_pool():
+    """
+    进程级共享的 I/O 线程池：上传文件落盘、.npz 写入在其中执行，
+    脚本线程只负责轮询并刷新界面（Streamlit 元素只能在脚本线程中更新）。
+    """
+    return ThreadPoolExecutor(max_workers=2)
+
+def _wait_for(future, on_tick=None, interval=0.1):
+    """轮询等待后台任务完成，期间每隔 interval 秒调用一次 on_tick 刷新界面；返回任务结果（异常原样抛出）"""
+    while not future.done():
+        if on_tick is not None:
+            on_tick()
+        time.sleep(interval)
+    return future.result()
+
+def _copy_upload(uploaded_file, dst):
+    """把上传的视频按 4 MB 分块复制到路径 dst（不先 read() 出整段字节）；文件句柄由执行复制的线程自己打开和关闭"""
+    uploaded_file.seek(0)
+    with open(dst, 'wb') as f:
+        shutil.copyfileobj(uploaded_file, f, 4 * 1024 * 1024)
+
+def _remove_temp_file(path):
+    """删除临时文件，路径为空或文件已不存在时忽略"""
+    if path:
+        try:
+            os.unlink(path)
+        except OSError:
+            pass
+
+def _remove_when_done(future, *paths):
+    """
+    删除临时文件；脚本被停止 / 重跑打断时后台任务可能仍在读写这些文件，此时等任务结束后再删除
+    """
+    if future is None or future.done():
+        for path in paths:
+            _remove_temp_file(path)
+    else:
+        future.add_done_callback(lambda _f: [_remove_temp_file(path) for path in paths])
+
+# 预览缩略图的最大宽度（像素），高分辨率首帧按整数步长抽样缩小后再发送给浏览器
+THUMBNAIL_MAX_WIDTH = 960
+
+@st.cache_data(show_spinner=False, max_entries=4)
+def _video_thumbnail(file_key, _uploaded_file):
+    """
+    上传视频的首帧缩略图（BGR），按 file_key（文件 ID、文件名、大小）缓存，每个上传只解码一次。
+    安装了 PyAV 时直接从内存中的上传文件解码；否则先落盘到临时文件再用 OpenCV 读取。
+    """
+    frame = read_first_frame(_uploaded_file)
+    if frame is None:
+        with tempfile.NamedTemporaryFile(delete=False, suffix=os.path.splitext(_uploaded_file.name)[1]) as tfile:
+            temp_path = tfile.name
+        try:
+            _copy_upload(_uploaded_file, temp_path)
+            frame = read_first_frame(temp_path)
+        finally:
+            _remove_temp_file(temp_path)
+    if frame is None:
+        return None
+    step = -(-frame.shape[1] // THUMBNAIL_MAX_WIDTH)  # 向上取整
+    return np.ascontiguousarray(frame[::step, ::step])
+
 # --- 保存帧序列为numpy文件 ---
+# deflate 压缩级别：视频帧数据上 1 级比默认的 6 级快约 7 倍，文件仅大 10%~15%，
+# 且仍是标准 .npz，Backend 与 np.load 无需额外依赖即可读取
+NPZ_COMPRESSLEVEL = 1
+
+def _uniform_frame_shape(frames):
+    """
+    帧列表中所有帧均为同尺寸、C 连续的 uint8 数组时返回单帧形状，否则返回 None（一次 O(N) 扫描）
+    """
+    if len(frames) == 0 or not isinstance(frames[0], np.ndarray):
+        return None
+    shape = frames[0].shape
+    for frame in frames:
+        if not (isinstance(frame, np.ndarray) and frame.shape == shape
+                and frame.dtype == np.uint8 and frame.flags.c_contiguous):
+            return None
+    return shape
+
+def _write_frame_rows(fp, frames, frame_shape):
+    """
+    把同尺寸 uint8 帧列表按 (N, H, W, 3) 连续数组的 .npy 格式写入 fp：
+    先写数组头，再逐帧写入原始字节，不必先 np.stack 出整段视频。
+    """
+    header = {
+        'descr': np.lib.format.dtype_to_descr(np.dtype(np.uint8)),
+        'fortran_order': False,
+        'shape': (len(frames),) + tuple(frame_shape),
+    }
+    try:
+        np.lib.format.write_array_header_1_0(fp, header)
+    except ValueError:
+        # 数组头超过 1.0 版本的 65535 字节上限时改用 2.0 版本
+        np.lib.format.write_array_header_2_0(fp, header)
+    for frame in frames:
+        fp.write(frame.data.cast('B'))  # 展平为一维字节视图，不复制
+
+def _write_npz(output_path, arrays, compresslevel=NPZ_COMPRESSLEVEL):
+    """
+    直接把各数组的 .npy 数据流式写入最终的 zip 成员（与 np.savez_compressed 格式相同），
+    不经过 savez 的中间 .npy 临时文件，也不在内存中拼出整个成员。
+    值为 (帧列表, 单帧形状) 时按连续数组逐帧写入（见 _write_frame_rows）。
+    """
+    with zipfile.ZipFile(output_path, 'w', compression=zipfile.ZIP_DEFLATED, compresslevel=compresslevel, allowZip64=True) as zf:
+        for name, array in arrays.items():
+            with zf.open(name + '.npy', 'w', force_zip64=True) as fp:
+                if isinstance(array, tuple):
+                    _write_frame_rows(fp, *array)
+                else:
+                    np.lib.format.write_array(fp, np.asanyarray(array), allow_pickle=True)
+
 def save_frames_to_numpy(frames, fps, output_path):
     """将帧序列保存为numpy压缩文件格式（Backend兼容格式）"""
     try:
+        frame_shape = None if isinstance(frames, np.ndarray) else _uniform_frame_shape(frames)
+        if isinstance(frames, np.ndarray):
+            # processor 输出的连续 (N, H, W, 3) 数组：按 uint8 连续存储，压缩率更高，
+            # Backend 可逐帧流式读取而无需反序列化对象数组
+            frames_payload = np.ascontiguousarray(frames, dtype=np.uint8)
+        elif frame_shape is not None:
+            # 帧列表但所有帧同尺寸、连续且为 uint8（最常见情况）：同样写成 (N, H, W, 3) uint8 连续数组，
+            # 逐帧写入，跳过对象数组及其 pickle 序列化
+            frames_payload = (frames, frame_shape)
+        else:
+            # 尺寸/类型不一致的帧列表：先建一维对象数组再逐元素填入，
+            # 避免 np.array(frames, dtype=object) 逐帧推断形状（同尺寸帧还会被展开成 (N, H, W, 3) 的对象数组）
+            frames_payload = np.empty(len(frames), dtype=object)  # 保存为对象数组
+            for i, frame in enumerate(frames):
+                frames_payload[i] = frame
+        
         # 保存为Backend可以直接使用的格式
-        np.savez_compressed(
-            output_path,
-            frames=np.array(frames, dtype=object),  # 保存为对象数组
-            fps=np.array([fps], dtype=np.int32)     # fps保存为整数
-        )
+        _write_npz(output_path, {
+            'frames': frames_payload,
+            'fps': np.array([fps], dtype=np.int32)     # fps保存为整数（保持 (1,) 形状，兼容 data['fps'][0] 的读取方式）
+        })
         return True, None
     except Exception as e:
         return False, str(e)
@@ -149,7 +304,7 @@ with st.sidebar:
     **输出格式：**
     - 文件格式：`.npz` (NumPy压缩格式)
     - 包含内容：
-      - `frames`: `list[np.ndarray]` - 视频帧序列
+      - `frames`: `np.ndarray (N, H, W, 3) uint8` - 视频帧序列
       - `fps`: `int` - 视频帧率
     
     **Backend兼容性：**
@@ -192,7 +347,7 @@ with st.container():
     <p><strong>输出格式：</strong></p>
     <ul>
         <li>📦 <strong>文件格式</strong>: .npz (NumPy压缩格式)</li>
-        <li>🎬 <strong>帧序列</strong>: list[np.ndarray] - 所有视频帧</li>
+        <li>🎬 <strong>帧序列</strong>: np.ndarray (N, H, W, 3) uint8 - 所有视频帧</li>
         <li>⏱️ <strong>帧率</strong>: int - 视频采样率 (FPS)</li>
     </ul>
     <p><strong>✅ 完全兼容Backend接口：</strong></p>
@@ -222,7 +377,18 @@ if uploaded_file is not None:
         # 显示视频预览和信息
         col1, col2 = st.columns([2, 1])
         with col1:
-            st.video(uploaded_file)
+            # 默认只显示首帧缩略图；完整播放器需把整段视频发送给浏览器，按需开启
+            if st.checkbox("▶️ 预览视频", value=False):
+                st.video(uploaded_file)
+            else:
+                thumbnail = _video_thumbnail(
+                    (getattr(uploaded_file, 'file_id', None), uploaded_file.name, uploaded_file.size),
+                    uploaded_file
+                )
+                if thumbnail is not None:
+                    st.image(thumbnail, channels="BGR", caption="首帧预览")
+                else:
+                    st.caption("无法读取视频首帧")
         with col2:
             file_size_mb = uploaded_file.size / 1024 / 1024
             st.metric("文件大小", f"{file_size_mb:.2f} MB")
@@ -253,49 +419,91 @@ if uploaded_file is not None:
                 status_display = st.empty()
                 log_container = st.empty()
                 
-                # 处理日志
-                logs = []
+                # 处理日志（只保留最近 10 条，不再每次切片整个列表）
+                logs = collections.deque(maxlen=10)
                 
                 def add_log(message):
-                    timestamp = datetime.now().strftime("%H:%M:%S")
-                    logs.append(f"[{timestamp}] {message}")
-                    log_text = "\n".join(logs[-10:])
+                    logs.append(f"[{time.strftime('%H:%M:%S')}] {message}")
+                    log_text = "\n".join(logs)
                     log_container.markdown(f"**📝 处理日志**\n\n```\n{log_text}\n```")
                 
+                last_progress_update = [0.0]
+                
                 def update_progress(progress, status_text):
+                    # 合并刷新：解码中途的进度最多每 0.05 秒（20 Hz）发送一次，
+                    # 开始（0）与结束（1）的消息总是显示，避免界面更新拖慢解码线程的进度转发
+                    now = time.monotonic()
+                    if 0.0 < progress < 1.0 and now - last_progress_update[0] < 0.05:
+                        return
+                    last_progress_update[0] = now
                     progress_bar.progress(progress)
                     status_display.info(status_text)
                 
-                # 保存上传的视频到临时文件
-                tfile = tempfile.NamedTemporaryFile(delete=False, suffix=os.path.splitext(uploaded_file.name)[1])
-                tfile.write(uploaded_file.read())
-                video_path = tfile.name
-                tfile.close()
-
+                # 同一视频（按内容哈希）本会话中已生成过 .npz 且文件仍在时直接复用，跳过落盘、解码与保存
+                upload_digest = hashlib.blake2b(uploaded_file.getbuffer(), digest_size=16).hexdigest()
+                npz_cache = st.session_state.setdefault('npz_cache', {})
+                cached = npz_cache.get(upload_digest)
+                if cached is not None and not os.path.exists(cached['npz_path']):
+                    del npz_cache[upload_digest]
+                    cached = None
+                
                 start_time = time.time()
+                # 临时文件与仍在读写它们的后台任务；Streamlit 的停止 / 重跑以 BaseException 打断脚本，
+                # 统一在 finally 中清理，异常与中断路径都不会遗留临时文件
+                video_path = None
+                copy_future = None
+                frames = None
+                save_future = None
+                partial_npz_path = None
                 try:
-                    add_log("正在初始化处理引擎...")
-                    
-                    # 实例化处理器
-                    processor = VideoProcessor()
-                    add_log("处理器初始化完成")
+                    if cached is None:
+                        # 保存上传的视频到临时文件（后台线程分块复制，脚本线程显示复制进度）
+                        with tempfile.NamedTemporaryFile(delete=False, suffix=os.path.splitext(uploaded_file.name)[1]) as tfile:
+                            video_path = tfile.name
+                        upload_size = max(1, uploaded_file.size)
+                        copy_future = _get_io_pool().submit(_copy_upload, uploaded_file, video_path)
+                        _wait_for(
+                            copy_future,
+                            lambda: status_display.info(f"正在保存上传的视频: {min(100, uploaded_file.tell() * 100 // upload_size)}%")
+                        )
+                        start_time = time.time()
 
-                    # 执行处理
-                    add_log("开始读取视频帧...")
-                    frames, fps = processor.process_video(video_path, update_progress)
-                    
-                    elapsed_time = time.time() - start_time
-                    add_log(f"处理完成！耗时: {elapsed_time:.1f}秒")
-                    add_log(f"共提取 {len(frames)} 帧，帧率: {fps} FPS")
+                    if cached is not None:
+                        add_log("该视频已处理过，直接使用已生成的.npz文件")
+                        update_progress(1.0, "使用缓存结果")
+                        fps = cached['fps']
+                        n_frames = cached['n_frames']
+                        frame_shape = cached['frame_shape']
+                        frames_dtype = cached['dtype']
+                        elapsed_time = cached['elapsed_time']
+                    else:
+                        add_log("正在初始化处理引擎...")
+                        
+                        # 获取（缓存的）处理器
+                        processor = get_processor()
+                        add_log("处理器初始化完成")
+
+                        # 执行处理
+                        add_log("开始读取视频帧...")
+                        frames, fps = processor.process_video(video_path, update_progress)
+                        
+                        elapsed_time = time.time() - start_time
+                        add_log(f"处理完成！耗时: {elapsed_time:.1f}秒")
+                        add_log(f"共提取 {len(frames)} 帧，帧率: {fps} FPS")
+                        
+                        n_frames = len(frames)
+                        frame_shape = tuple(frames.shape[1:]) if n_frames > 0 else ()
+                        frames_dtype = str(frames.dtype)
                     
-                    # 存储到session_state
-                    st.session_state.frames = frames
+                    # session_state 只保存元数据，帧数据本身在写入 .npz 后即释放
+                    st.session_state.n_frames = n_frames
+                    st.session_state.frame_shape = frame_shape
                     st.session_state.fps = fps
                     st.session_state.processing_complete = True
                     st.session_state.processed_file_name = uploaded_file.name
                     
                     # 显示结果
-                    st.success(f"✅ 处理完成！共提取 {len(frames)} 帧，帧率: {fps} FPS")
+                    st.success(f"✅ 处理完成！共提取 {n_frames} 帧，帧率: {fps} FPS")
                     st.balloons()
                     
                     # 结果展示
@@ -304,15 +512,15 @@ if uploaded_file is not None:
                     
                     result_col1, result_col2, result_col3 = st.columns(3)
                     with result_col1:
-                        st.metric("总帧数", f"{len(frames):,}")
+                        st.metric("总帧数", f"{n_frames:,}")
                     with result_col2:
                         st.metric("帧率", f"{fps} FPS")
                     with result_col3:
                         st.metric("处理时间", f"{elapsed_time:.1f}秒")
                     
                     # 显示帧信息
-                    if len(frames) > 0:
-                        st.info(f"📐 分辨率: {frames[0].shape[1]}×{frames[0].shape[0]} 像素 | 数据类型: {frames[0].dtype}")
+                    if n_frames > 0:
+                        st.info(f"📐 分辨率: {frame_shape[1]}×{frame_shape[0]} 像素 | 数据类型: {frames_dtype}")
                     
                     # 生成并下载.npz文件
                     st.markdown("---")
@@ -323,76 +531,88 @@ if uploaded_file is not None:
                     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
                     npz_filename = f"{video_name}_frames_{timestamp}.npz"
                     
-                    # 创建临时文件
-                    temp_npz = tempfile.NamedTemporaryFile(delete=False, suffix='.npz')
-                    temp_npz_path = temp_npz.name
-                    temp_npz.close()
-                    
-                    # 保存为npz文件
-                    with st.spinner("正在生成.npz文件..."):
-                        success, error = save_frames_to_numpy(frames, fps, temp_npz_path)
+                    if cached is not None:
+                        temp_npz_path = cached['npz_path']
+                        success, error = True, None
+                    else:
+                        # 创建临时文件
+                        temp_npz = tempfile.NamedTemporaryFile(delete=False, suffix='.npz')
+                        temp_npz_path = temp_npz.name
+                        temp_npz.close()
+                        partial_npz_path = temp_npz_path
+                        
+                        # 保存为npz文件
+                        with st.spinner("正在生成.npz文件..."):
+                            save_status = st.empty()
+                            save_future = _get_io_pool().submit(save_frames_to_numpy, frames, fps, temp_npz_path)
+                            success, error = _wait_for(
+                                save_future,
+                                lambda: save_status.caption(f"已写入 {os.path.getsize(temp_npz_path) / (1024 * 1024):.1f} MB")
+                            )
+                            save_status.empty()
                         
                         if success:
-                            file_size = os.path.getsize(temp_npz_path) / (1024 * 1024)
-                            
-                            # 读取文件内容用于下载
-                            with open(temp_npz_path, 'rb') as f:
-                                npz_data = f.read()
-                            
-                            st.success(f"✅ .npz文件生成成功！文件大小: {file_size:.2f} MB")
-                            
-                            # 显示文件信息
-                            st.markdown("""
-                            <div class="result-card">
-                            <h4>📄 文件信息</h4>
-                            <ul>
-                                <li><strong>文件名</strong>: {}</li>
-                                <li><strong>文件大小</strong>: {:.2f} MB</li>
-                                <li><strong>格式</strong>: NumPy压缩格式 (.npz)</li>
-                                <li><strong>内容</strong>: frames (list[np.ndarray]), fps (int)</li>
-                                <li><strong>Backend兼容</strong>: ✅ 完全兼容</li>
-                            </ul>
-                            </div>
-                            """.format(npz_filename, file_size), unsafe_allow_html=True)
-                            
-                            # 下载按钮
+                            partial_npz_path = None
+                            npz_cache[upload_digest] = {
+                                'npz_path': temp_npz_path, 'fps': fps, 'n_frames': n_frames,
+                                'frame_shape': frame_shape, 'dtype': frames_dtype, 'elapsed_time': elapsed_time,
+                            }
+                    
+                    if success:
+                        file_size = os.path.getsize(temp_npz_path) / (1024 * 1024)
+                        
+                        st.success(f"✅ .npz文件生成成功！文件大小: {file_size:.2f} MB")
+                        
+                        # 显示文件信息
+                        st.markdown("""
+                        <div class="result-card">
+                        <h4>📄 文件信息</h4>
+                        <ul>
+                            <li><strong>文件名</strong>: {}</li>
+                            <li><strong>文件大小</strong>: {:.2f} MB</li>
+                            <li><strong>格式</strong>: NumPy压缩格式 (.npz)</li>
+                            <li><strong>内容</strong>: frames (np.ndarray (N, H, W, 3) uint8), fps (int)</li>
+                            <li><strong>Backend兼容</strong>: ✅ 完全兼容</li>
+                        </ul>
+                        </div>
+                        """.format(npz_filename, file_size), unsafe_allow_html=True)
+                        
+                        # 下载按钮（直接传入文件句柄，脚本中不再额外持有一份文件内容）
+                        with open(temp_npz_path, 'rb') as npz_file:
                             st.download_button(
                                 label="⬇️ 下载Backend格式文件 (.npz)",
-                                data=npz_data,
+                                data=npz_file,
                                 file_name=npz_filename,
                                 mime="application/octet-stream",
                                 type="primary",
                                 use_container_width=True,
                                 help="下载包含视频帧序列和帧率的.npz文件，可直接用于Backend分析"
                             )
-                            
-                            # 使用说明
-                            st.markdown("---")
-                            st.markdown("### 📖 使用说明")
-                            st.markdown("""
-                            **在Backend中使用此文件：**
-                            
-                            ```python
-                            import numpy as np
-                            from Backend.WindVibAnalysis.main_workflow import run_image_analysis
-                            
-                            # 加载文件
-                            data = np.load('{}', allow_pickle=True)
-                            frames = data['frames']
-                            fps = int(data['fps'][0])
-                            
-                            # 转换为列表格式
-                            frames_list = [frame for frame in frames]
-                            
-                            # 调用Backend分析
-                            result = run_image_analysis(frames_list, fps)
-                            ```
-                            """.format(npz_filename))
-                            
-                            # 存储文件路径（可选，用于后续操作）
-                            st.session_state.npz_file_path = temp_npz_path
-                        else:
-                            st.error(f"❌ 生成.npz文件失败: {error}")
+                        
+                        # 使用说明
+                        st.markdown("---")
+                        st.markdown("### 📖 使用说明")
+                        st.markdown("""
+                        **在Backend中使用此文件：**
+                        
+                        ```python
+                        from Backend.WindVibAnalysis.main_workflow import run_image_analysis_from_npz, iter_frames_from_npz
+                        
+                        # 直接分析：从 npz 中逐帧流式读取，不会把整段视频解压到内存
+                        result = run_image_analysis_from_npz('{0}')
+                        
+                        # 需要自行逐帧处理时使用惰性迭代器
+                        # （npz 为 zip 压缩格式，np.load 的 mmap_mode 对其无效，data['frames'] 会一次性解压全部帧）
+                        frame_iter, n_frames, fps = iter_frames_from_npz('{0}')
+                        for frame in frame_iter:  # 每帧 (H, W, 3) uint8
+                            ...
+                        ```
+                        """.format(npz_filename))
+                        
+                        # 存储文件路径（可选，用于后续操作）
+                        st.session_state.npz_file_path = temp_npz_path
+                    else:
+                        st.error(f"❌ 生成.npz文件失败: {error}")
                     
                     # 处理统计
                     st.markdown("---")
@@ -404,7 +624,7 @@ if uploaded_file is not None:
                         speed = file_size_mb / elapsed_time if elapsed_time > 0 else 0
                         st.metric("处理速度", f"{speed:.2f} MB/s")
                     with stat_col3:
-                        frames_per_sec = len(frames) / elapsed_time if elapsed_time > 0 else 0
+                        frames_per_sec = n_frames / elapsed_time if elapsed_time > 0 else 0
                         st.metric("帧提取速度", f"{frames_per_sec:.1f} 帧/秒")
                     
                     # 清空并重新开始按钮
@@ -466,8 +686,10 @@ if uploaded_file is not None:
                                    help="清空当前处理结果，准备处理下一个文件", key="reset_error"):
                             reset_processing_state()
                 finally:
-                    try:
-                        os.unlink(video_path)  # 删除临时视频文件
-                    except (PermissionError, FileNotFoundError):
-                        pass
+                    # 临时视频文件（使用缓存结果时未创建）、processor 的临时帧文件（N*H*W*3 字节），
+                    # 以及未成功生成的 .npz；帧数据已写入 .npz 或处理中断后都不再需要
+                    frames_path = getattr(frames, 'filename', None)
+                    frames = None
+                    _remove_when_done(copy_future, video_path)
+                    _remove_when_done(save_future, frames_path, partial_npz_path)
         st.markdown('</div>', unsafe_allow_html=True)
@@ -1,38 +1,641 @@
 import cv2
 import numpy as np
+import multiprocessing
+import os
+import platform
+import queue
+import tempfile
+import threading
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from datetime import datetime
 import warnings
 
+try:
+    import av
+    AV_AVAILABLE = True
+except ImportError:
+    AV_AVAILABLE = False
+
 # 忽略OpenCV的警告
 warnings.filterwarnings('ignore')
 
+# 可选的解码后端：pyav 使用 FFmpeg 切片多线程解码且解码期间释放 GIL，opencv 为兜底
+DECODER_BACKENDS = ('auto', 'pyav', 'opencv')
+
+# 硬件解码设备的优先顺序（macOS 为 VideoToolbox，其余平台依次尝试 NVDEC 及系统自带的解码接口）
+HWACCEL_DEVICES = ('videotoolbox',) if platform.system() == 'Darwin' else ('cuda', 'd3d11va', 'dxva2', 'vaapi')
+
+# 超过该大小的视频文件按关键帧区间多进程并行解码，短视频并行的进程启动开销得不偿失
+PARALLEL_DECODE_MIN_BYTES = 500 * 1024 * 1024
+
+
+def _pyav_hwaccel():
+    """
+    检测当前 PyAV/FFmpeg 可用的硬件解码设备，返回 HWAccel 配置；不支持（PyAV 过旧或无可用设备）时返回 None
+    """
+    try:
+        from av.codec.hwaccel import HWAccel, hwdevices_available
+        available = hwdevices_available()
+    except Exception:
+        return None
+    for device in HWACCEL_DEVICES:
+        if device in available:
+            # 个别编码格式/分辨率硬件不支持时由 FFmpeg 自动退回软件解码
+            return HWAccel(device_type=device, allow_software_fallback=True)
+    return None
+
+
+class _FrameStore:
+    """
+    磁盘支撑的帧缓冲：解码出的帧逐帧写入临时文件上的 (N, H, W, C) np.memmap，
+    不再以 Python 列表常驻内存。容量按视频元数据的总帧数预分配，实际帧数更多时按块扩容。
+    """
+    def __init__(self, capacity, frame_shape, dtype):
+        fd, self.path = tempfile.mkstemp(suffix='.frames')
+        os.close(fd)
+        self.frame_shape = tuple(frame_shape)
+        self.dtype = np.dtype(dtype)
+        self.count = 0
+        self._mm = None
+        self._capacity = 0
+        self._resize(max(1, int(capacity)))
+
+    def _resize(self, capacity):
+        # 先释放旧映射再调整文件大小（Windows 下不能截断仍被映射的文件）
+        if self._mm is not None:
+            self._mm.flush()
+            self._mm = None
+        frame_nbytes = int(np.prod(self.frame_shape)) * self.dtype.itemsize
+        with open(self.path, 'r+b') as f:
+            f.truncate(capacity * frame_nbytes)
+        self._mm = np.memmap(self.path, dtype=self.dtype, mode='r+', shape=(capacity,) + self.frame_shape)
+        self._capacity = capacity
+
+    def reset(self, frame_shape, dtype):
+        """
+        尚未写入任何帧时更换帧格式（视频元数据给出的分辨率与实际解码结果不符时使用）
+        """
+        if self.count:
+            raise ValueError("已写入帧后不能更换帧格式")
+        self.frame_shape = tuple(frame_shape)
+        self.dtype = np.dtype(dtype)
+        self._resize(self._capacity)
+
+    def slot(self):
+        """
+        返回下一帧所在行的可写视图，解码器可直接把帧写入其中，写完后调用 commit()
+        """
+        if self.count == self._capacity:
+            self._resize(self._capacity + max(64, self._capacity // 4))
+        return self._mm[self.count]
+
+    def commit(self):
+        self.count += 1
+
+    def append(self, frame):
+        if frame.shape != self.frame_shape or frame.dtype != self.dtype:
+            raise ValueError(f"帧尺寸/类型不一致: {frame.shape} {frame.dtype}，期望 {self.frame_shape} {self.dtype}")
+        self.slot()[...] = frame
+        self.commit()
+
+    def finish(self):
+        """
+        收缩到实际帧数并返回 (count, H, W, C) 的 memmap（数据在临时文件 self.path 中）
+        """
+        if self.count == 0:
+            self.discard()
+            return np.empty((0,) + self.frame_shape, dtype=self.dtype)
+        if self.count != self._capacity:
+            self._resize(self.count)
+        self._mm.flush()
+        return self._mm
+
+    def discard(self):
+        self._mm = None
+        try:
+            os.unlink(self.path)
+        except OSError:
+            pass
+
+
+def _frame_writer(frame_queue, total_frames, result, stop_event):
+    """
+    写入线程：从有界队列取出解码帧写入 _FrameStore，None 表示结束。
+    result 用于把 store 和写入线程中的异常交回调用方；出错时置位 stop_event 让解码线程提前停止。
+    """
+    store = None
+    try:
+        while True:
+            frame = frame_queue.get()
+            if frame is None:
+                break
+            if store is None:
+                store = _FrameStore(total_frames, frame.shape, frame.dtype)
+                result['store'] = store
+            store.append(frame)
+    except Exception as e:
+        result['error'] = e
+        stop_event.set()
+        # 继续取空队列，避免解码线程阻塞在 put 上
+        while frame_queue.get() is not None:
+            pass
+
+
+def _scan_keyframes(video_path):
+    """
+    只解复用不解码，扫描视频流所有数据包的时间戳
+    :return: (pts_sorted, keyframe_pts) - 按显示顺序排列的全部帧 pts，以及关键帧 pts 列表
+    """
+    container = av.open(video_path)
+    try:
+        stream = container.streams.video[0]
+        pts_all = []
+        keyframe_pts = []
+        for packet in container.demux(stream):
+            if packet.pts is None:
+                continue
+            pts_all.append(packet.pts)
+            if packet.is_keyframe:
+                keyframe_pts.append(packet.pts)
+        return sorted(pts_all), sorted(keyframe_pts)
+    finally:
+        container.close()
+
+
+def _split_intervals(pts_sorted, keyframe_pts, n_segments):
+    """
+    按关键帧把帧序列划分为约 n_segments 个帧数相近的区间（帧序号即 pts 在显示顺序中的位置）
+    :return: [(start_pts, {pts: 帧序号}), ...]，第一个区间 start_pts 为 None（从头解码）
+    """
+    index_of = {pts: i for i, pts in enumerate(pts_sorted)}
+    keyframe_idx = sorted(index_of[pts] for pts in keyframe_pts if pts in index_of)
+    n = len(pts_sorted)
+    bounds = [0]
+    for k in range(1, n_segments):
+        target = k * n // n_segments
+        # 取不早于目标位置的第一个关键帧作为区间边界
+        candidates = [i for i in keyframe_idx if i >= target and i > bounds[-1]]
+        if candidates:
+            bounds.append(candidates[0])
+    bounds.append(n)
+    segments = []
+    for a, b in zip(bounds[:-1], bounds[1:]):
+        if b <= a:
+            continue
+        start_pts = None if a == 0 else pts_sorted[a]
+        segments.append((start_pts, {pts_sorted[i]: i for i in range(a, b)}))
+    return segments
+
+
+def _decode_interval(video_path, frames_path, shape, start_pts, pts_index):
+    """
+    进程池工作函数：独立打开视频，seek 到区间起始关键帧并解码，
+    把 pts_index 中的帧写入共享 memmap 对应行；解码器按显示顺序输出，超过区间最大 pts 即停止。
+    :return: (实际写入的帧数, 错误信息)；正常结束时错误信息为 None，
+             出错时为 "异常类型: 消息" 字符串（PyAV 异常未必能跨进程序列化），由调用方判定是否完整并报告原因
+    """
+    written = 0
+    error = None
+    container = av.open(video_path)
+    try:
+        stream = container.streams.video[0]
+        mm = np.memmap(frames_path, dtype=np.uint8, mode='r+', shape=shape)
+        last_pts = max(pts_index)
+        if start_pts is not None:
+            container.seek(start_pts, stream=stream, backward=True, any_frame=False)
+        for av_frame in container.decode(stream):
+            if av_frame.pts is None:
+                continue
+            index = pts_index.get(av_frame.pts)
+            if index is not None:
+                mm[index] = av_frame.to_ndarray(format='bgr24')
+                written += 1
+                if written == len(pts_index):
+                    break
+            elif av_frame.pts > last_pts:
+                break
+        mm.flush()
+    except Exception as e:
+        error = f"{type(e).__name__}: {e}"
+    finally:
+        container.close()
+    return written, error
+
+
+def read_first_frame(source):
+    """
+    读取视频的第一帧，用于上传后的预览缩略图
+    :param source: 视频路径，或可 seek 的二进制文件对象（需安装 PyAV；OpenCV 只能读取路径）
+    :return: (H, W, 3) 的 BGR uint8 数组，无法读取时返回 None
+    """
+    if AV_AVAILABLE:
+        try:
+            if not isinstance(source, (str, os.PathLike)):
+                source.seek(0)
+            container = av.open(source)
+            try:
+                for av_frame in container.decode(video=0):
+                    return av_frame.to_ndarray(format='bgr24')
+            finally:
+                container.close()
+        except Exception:
+            pass
+    if isinstance(source, (str, os.PathLike)):
+        cap = cv2.VideoCapture(source)
+        try:
+            ok, frame = cap.read()
+            return frame if ok else None
+        finally:
+            cap.release()
+    return None
+
 
 class VideoProcessor:
-    def __init__(self):
+    def __init__(self, decoder='auto', hwaccel=True, parallel=True):
         """
         视频处理器 - 直接读取视频帧，输出Backend所需格式
+        
+        :param decoder: 解码后端 'auto' | 'pyav' | 'opencv'；
+                        'auto' 在安装了 PyAV 时优先使用它，打开失败再退回 OpenCV
+        :param hwaccel: 是否尝试硬件解码（NVDEC / VideoToolbox 等），不可用时自动使用软件解码
+        :param parallel: 是否对大于 PARALLEL_DECODE_MIN_BYTES 的视频按关键帧区间多进程并行解码（需 PyAV）
+        """
+        if decoder not in DECODER_BACKENDS:
+            raise ValueError(f"未知的解码后端: {decoder}，可选: {', '.join(DECODER_BACKENDS)}")
+        if decoder == 'pyav' and not AV_AVAILABLE:
+            raise ImportError("未安装 PyAV，无法使用 pyav 解码后端（pip install av）")
+        self.decoder = decoder
+        self.hwaccel = hwaccel
+        self.parallel = parallel
+        # 硬件解码设备只探测一次，实例经 st.cache_resource 复用时后续处理不再重复探测
+        self._hwaccel_config = _pyav_hwaccel() if hwaccel and AV_AVAILABLE else None
+
+    def _open_pyav(self, video_path):
+        """
+        用 PyAV 打开视频并开启切片多线程解码（可用时启用硬件解码）
+        :return: (container, stream, fps, total_frames, width, height, hw_device)；
+                 hw_device 为实际使用的硬件解码设备，None 表示软件解码
+        """
+        container = None
+        hw_device = None
+        hw = self._hwaccel_config
+        if hw is not None:
+            try:
+                container = av.open(video_path, hwaccel=hw)
+                hw_device = hw.device_type
+            except Exception:
+                container = None
+        if container is None:
+            container = av.open(video_path)
+        try:
+            stream = container.streams.video[0]
+            stream.thread_type = "SLICE"
+            stream.thread_count = os.cpu_count() or 0
+            rate = stream.average_rate or stream.guessed_rate
+            fps = float(rate) if rate else 0.0
+            total_frames = int(stream.frames or 0)
+            # 部分容器不记录总帧数，按时长估算（仅用于进度显示和预分配）
+            if total_frames <= 0 and stream.duration and stream.time_base:
+                total_frames = int(round(float(stream.duration * stream.time_base) * fps))
+            return container, stream, fps, total_frames, stream.codec_context.width, stream.codec_context.height, hw_device
+        except Exception:
+            container.close()
+            raise
+
+    def _decode_frames_av(self, container, stream, total_frames, frame_queue, report, stop_event):
+        """
+        解码线程（PyAV）：按数据包解码，单个损坏数据包只跳过该包，逻辑与 _decode_frames 一致。
+        :return: (n_extracted, failed_frames)
+        """
+        n_extracted = 0
+        frame_format = None
+        failed_frames = 0
+        max_failed_frames = 10  # 允许连续失败的帧数
+        consecutive_failures = 0
+        i = 0  # 已解码的帧序号
+
+        # demux 末尾会给出空数据包，decode 它即可冲刷解码器中缓存的帧
+        for packet in container.demux(stream):
+            if stop_event.is_set():
+                break
+            try:
+                decoded = packet.decode()
+            except Exception as e:
+                failed_frames += 1
+                consecutive_failures += 1
+                if consecutive_failures >= max_failed_frames:
+                    report(
+                        min(1.0, i / total_frames),
+                        f"错误: 连续 {max_failed_frames} 帧读取失败 ({str(e)})，停止读取。已提取: {n_extracted} 帧"
+                    )
+                    break
+                continue
+
+            for av_frame in decoded:
+                i += 1
+                frame = av_frame.to_ndarray(format='bgr24')
+                if frame.size == 0:
+                    consecutive_failures += 1
+                    failed_frames += 1
+                    continue
+                if frame_format is None:
+                    frame_format = (frame.shape, frame.dtype)
+                elif (frame.shape, frame.dtype) != frame_format:
+                    consecutive_failures += 1
+                    failed_frames += 1
+                    continue
+                
+                consecutive_failures = 0
+                frame_queue.put(frame)
+                n_extracted += 1
+
+                if i % 10 == 0 or i == total_frames:
+                    status_text = f"读取中: {i}/{total_frames} 帧 | 已提取: {n_extracted} 帧"
+                    if failed_frames > 0:
+                        status_text += f" | 跳过: {failed_frames} 帧"
+                    report(min(1.0, i / total_frames), status_text)
+
+        return n_extracted, failed_frames
+
+    def _decode_frames(self, cap, total_frames, store, report, stop_event):
+        """
+        解码线程（OpenCV）：顺序读取所有帧，第 i 个有效帧直接解码到 store 预分配的第 i 行（增强错误处理）。
+        界面只提供"提取全部帧"，因此只做一次 grab() + retrieve() 前向扫描，从不按帧号 seek
+        （CAP_PROP_POS_FRAMES 跳转会从最近的关键帧重新解码，长 GOP 视频上代价极高）；
+        读取失败的帧直接跳过，下一次 grab() 自然前进到后一帧。
+        进度通过 report(progress, status_text) 交给界面线程；stop_event 置位时提前结束。
+        :return: (n_extracted, failed_frames)
+        """
+        n_extracted = 0
+        failed_frames = 0
+        max_failed_frames = 10  # 允许连续失败的帧数
+        consecutive_failures = 0
+
+        # 直接读取所有帧，增强错误处理
+        for i in range(total_frames):
+            if stop_event.is_set():
+                break
+            try:
+                # 尝试读取帧：grab() 只解复用+解码，retrieve() 传入 memmap 中下一行的视图，
+                # 尺寸一致时 OpenCV 直接把转换后的帧写入该行而不另行分配
+                slot = store.slot()
+                ret = cap.grab()
+                frame = None
+                if ret:
+                    ret, frame = cap.retrieve(slot)
+                
+                # 检查读取结果
+                if not ret or frame is None:
+                    consecutive_failures += 1
+                    failed_frames += 1
+                    
+                    if consecutive_failures >= max_failed_frames:
+                        report(
+                            (i + 1) / total_frames,
+                            f"警告: 连续 {max_failed_frames} 帧读取失败，停止读取。已提取: {n_extracted} 帧"
+                        )
+                        break
+                    continue
+                
+                # 验证帧数据
+                if frame.size == 0:
+                    consecutive_failures += 1
+                    failed_frames += 1
+                    continue
+                if frame is not slot:
+                    # 帧格式与预分配的不同：元数据不准时以首个有效帧为准，之后的不一致帧跳过
+                    if store.count == 0:
+                        store.reset(frame.shape, frame.dtype)
+                    elif (frame.shape, frame.dtype) != (store.frame_shape, store.dtype):
+                        consecutive_failures += 1
+                        failed_frames += 1
+                        continue
+                    store.slot()[...] = frame
+                
+                # 重置连续失败计数
+                consecutive_failures = 0
+                
+                # 确认该行为有效帧
+                store.commit()
+                n_extracted += 1
+
+                # 更新UI进度（每10帧更新一次，减少UI更新开销）
+                if i % 10 == 0 or i == total_frames - 1:
+                    progress = (i + 1) / total_frames
+                    status_text = f"读取中: {i+1}/{total_frames} 帧 | 已提取: {n_extracted} 帧"
+                    if failed_frames > 0:
+                        status_text += f" | 跳过: {failed_frames} 帧"
+                    report(progress, status_text)
+            
+            except Exception as e:
+                # 捕获单个帧读取的错误，继续处理
+                failed_frames += 1
+                consecutive_failures += 1
+                
+                if consecutive_failures >= max_failed_frames:
+                    report(
+                        (i + 1) / total_frames,
+                        f"错误: 连续 {max_failed_frames} 帧读取失败 ({str(e)})，停止读取。已提取: {n_extracted} 帧"
+                    )
+                    break
+                continue
+
+        return n_extracted, failed_frames
+
+    def _decode_parallel(self, video_path, total_frames, width, height, status_callback):
+        """
+        长视频分段并行解码：按关键帧把视频划分为若干区间，每个进程独立 av.open + seek 到区间起点，
+        把帧直接写入共享临时文件 memmap 中对应的位置。
+        任一区间出错或帧数不足（损坏、时间戳异常等）时通过 status_callback 报告原因并返回 None，由调用方改用顺序解码。
+        :return: (N, H, W, 3) 的 np.memmap 或 None
+        """
+        n_segments = max(2, (os.cpu_count() or 2) // 2)
+        status_callback(0.0, "并行解码: 正在扫描关键帧...")
+        try:
+            pts_sorted, keyframe_pts = _scan_keyframes(video_path)
+        except Exception as e:
+            # 损坏的数据包 / 解复用错误：与其他并行解码失败一样交回顺序解码（顺序解码可容忍坏包）
+            status_callback(0.0, f"并行解码: 扫描关键帧失败（{type(e).__name__}: {e}）")
+            return None
+        if len(pts_sorted) == 0 or len(keyframe_pts) < 2:
+            return None
+        segments = _split_intervals(pts_sorted, keyframe_pts, n_segments)
+        if len(segments) < 2:
+            return None
+
+        store = _FrameStore(len(pts_sorted), (height, width, 3), np.uint8)
+        shape = (len(pts_sorted), height, width, 3)
+        done = False
+        try:
+            status_callback(0.0, f"并行解码: {len(segments)} 个区间 / {len(pts_sorted)} 帧（软件解码）")
+            # Streamlit 服务进程是多线程的，fork 可能复制到被其他线程持有的锁而死锁，工作进程改用 spawn 启动
+            with ProcessPoolExecutor(max_workers=len(segments), mp_context=multiprocessing.get_context('spawn')) as pool:
+                futures = [
+                    pool.submit(_decode_interval, video_path, store.path, shape, start_pts, pts_index)
+                    for start_pts, pts_index in segments
+                ]
+                written = 0
+                errors = []
+                for k, future in enumerate(as_completed(futures), 1):
+                    try:
+                        n_written, error = future.result()
+                    except Exception as e:
+                        # 工作进程异常退出（BrokenProcessPool 等）
+                        n_written, error = 0, f"{type(e).__name__}: {e}"
+                    written += n_written
+                    if error is not None:
+                        errors.append(error)
+                    status_callback(k / len(futures), f"并行解码: 已完成 {k}/{len(futures)} 个区间 | 已提取: {written} 帧")
+            if errors:
+                status_callback(0.0, f"并行解码: {len(errors)} 个区间出错（{errors[0]}）")
+                return None
+            if written != len(pts_sorted):
+                status_callback(0.0, f"并行解码: 仅提取 {written}/{len(pts_sorted)} 帧（时间戳与扫描结果不一致）")
+                return None
+            store.count = len(pts_sorted)
+            frames = store.finish()
+            done = True
+            return frames
+        finally:
+            if not done:
+                store.discard()
+
+    def _decode_sequential(self, cap, container, stream, total_frames, width, height, status_callback):
         """
-        pass
+        顺序解码流水线，调用线程（Streamlit 脚本线程）只负责把进度消息转发给 status_callback，
+        因为 Streamlit 元素只能在脚本线程中更新：
+        - PyAV：解码线程 -> 有界队列 -> 写入线程落盘到 memmap；
+        - OpenCV：按元数据预分配 (N, H, W, 3) memmap，解码线程把第 i 帧直接解码到第 i 行，无需写入线程。
+        :return: (frames, failed_frames)
+        """
+        frame_queue = None
+        writer = None
+        decoder = None
+        writer_result = {}
+        stop_event = threading.Event()
+        try:
+            if container is not None:
+                # 解码帧经有界队列交给写入线程落盘，内存中最多只保留队列中的几帧
+                frame_queue = queue.Queue(maxsize=8)
+                writer = threading.Thread(target=_frame_writer, args=(frame_queue, total_frames, writer_result, stop_event), daemon=True)
+                writer.start()
+            else:
+                # 元数据缺少分辨率时先按 1x1 占位，首个有效帧解码后由 _FrameStore.reset 修正
+                frame_shape = (height, width, 3) if width > 0 and height > 0 else (1, 1, 3)
+                writer_result['store'] = _FrameStore(total_frames, frame_shape, np.uint8)
+            
+            # 解码线程（cv2 / PyAV 解码时均释放 GIL），进度消息经 progress_queue 回到本线程
+            progress_queue = queue.Queue()
+            decode_result = {}
+            
+            def _report(progress, text):
+                progress_queue.put((progress, text))
+            
+            def _run_decoder():
+                try:
+                    if container is not None:
+                        decode_result['stats'] = self._decode_frames_av(
+                            container, stream, total_frames, frame_queue, _report, stop_event
+                        )
+                    else:
+                        decode_result['stats'] = self._decode_frames(
+                            cap, total_frames, writer_result['store'], _report, stop_event
+                        )
+                except Exception as e:
+                    decode_result['error'] = e
+                finally:
+                    if frame_queue is not None:
+                        frame_queue.put(None)
+                    progress_queue.put(None)
+            
+            decoder = threading.Thread(target=_run_decoder, daemon=True)
+            decoder.start()
+            
+            # 界面线程：转发进度直到解码结束
+            while True:
+                message = progress_queue.get()
+                if message is None:
+                    break
+                status_callback(*message)
+            
+            # 等待写入线程把剩余帧落盘
+            decoder.join()
+            if writer is not None:
+                writer.join()
+            decoder = None
+            frame_queue = None
+            if 'error' in decode_result:
+                raise decode_result['error']
+            if 'error' in writer_result:
+                raise writer_result['error']
+            writer_result['done'] = True
+            n_extracted, failed_frames = decode_result['stats']
+            store = writer_result.get('store')
+            frames = store.finish() if store is not None else []
+            return frames, failed_frames
+        finally:
+            # 异常退出（包括界面回调抛出的中断）时停止解码、结束写入线程并删除未完成的临时帧文件
+            stop_event.set()
+            if decoder is not None:
+                decoder.join()
+            elif frame_queue is not None:
+                frame_queue.put(None)
+            if writer is not None:
+                writer.join()
+            if not writer_result.get('done') and 'store' in writer_result:
+                writer_result['store'].discard()
 
     def process_video(self, video_path, status_callback):
         """
         执行视频处理流程：直接读取所有视频帧（增强错误处理）
+        
+        大于 PARALLEL_DECODE_MIN_BYTES 的视频（需安装 PyAV）按关键帧区间多进程并行解码，
+        其余情况或并行解码失败时使用顺序解码流水线（见 _decode_sequential）。
+        
         :param video_path: 视频路径
         :param status_callback: 用于更新UI进度的回调函数 (progress, status_text)
-        :return: (frames, fps) - 帧序列列表和帧率
+        :return: (frames, fps) - 帧序列 (N, H, W, 3) 以及帧率；frames 为临时文件上的 np.memmap（路径见 frames.filename）
         """
         cap = None
+        container = None
+        stream = None
+        # 本次处理实际使用的硬件解码设备（None 为软件解码）；只保存在局部变量中，共享的处理器实例不记录逐次调用的状态
+        hw_device = None
         try:
-            # 尝试打开视频文件
-            cap = cv2.VideoCapture(video_path)
-            if not cap.isOpened():
-                raise ValueError(f"无法打开视频文件: {video_path}")
-
-            # 获取视频基本信息
-            fps = cap.get(cv2.CAP_PROP_FPS)
-            total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
-            width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
-            height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+            # 尝试打开视频文件：优先 PyAV，'auto' 模式下打开失败则退回 OpenCV
+            if self.decoder != 'opencv' and AV_AVAILABLE:
+                try:
+                    container, stream, fps, total_frames, width, height, hw_device = self._open_pyav(video_path)
+                except Exception:
+                    if self.decoder == 'pyav':
+                        raise
+                    container = None
+                    hw_device = None
+            
+            if container is None:
+                cap = None
+                if self.hwaccel and hasattr(cv2, 'CAP_PROP_HW_ACCELERATION'):
+                    # OpenCV 4.5.2+：请求任意可用的硬件解码，不支持时后端自行使用软件解码
+                    cap = cv2.VideoCapture(
+                        video_path, cv2.CAP_ANY,
+                        [cv2.CAP_PROP_HW_ACCELERATION, cv2.VIDEO_ACCELERATION_ANY]
+                    )
+                    if cap.isOpened():
+                        if int(cap.get(cv2.CAP_PROP_HW_ACCELERATION)) != cv2.VIDEO_ACCELERATION_NONE:
+                            hw_device = 'opencv'
+                    else:
+                        cap.release()
+                        cap = None
+                if cap is None:
+                    cap = cv2.VideoCapture(video_path)
+                if not cap.isOpened():
+                    raise ValueError(f"无法打开视频文件: {video_path}")
+
+                # 获取视频基本信息
+                fps = cap.get(cv2.CAP_PROP_FPS)
+                total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+                width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+                height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
             
             # 验证基本信息
             if fps <= 0:
@@ -40,75 +643,20 @@ class VideoProcessor:
             if total_frames <= 0:
                 raise ValueError("无法获取视频总帧数，视频文件可能损坏")
             
-            status_callback(0.0, f"视频信息: {width}x{height}, {fps:.2f} FPS, 总帧数: {total_frames}")
-
-            # 初始化帧列表
-            frames = []
-            failed_frames = 0
-            max_failed_frames = 10  # 允许连续失败的帧数
-            consecutive_failures = 0
-
-            # 直接读取所有帧，增强错误处理
-            for i in range(total_frames):
-                try:
-                    # 尝试读取帧
-                    ret, frame = cap.read()
-                    
-                    # 检查读取结果
-                    if not ret or frame is None:
-                        consecutive_failures += 1
-                        failed_frames += 1
-                        
-                        if consecutive_failures >= max_failed_frames:
-                            status_callback(
-                                (i + 1) / total_frames,
-                                f"警告: 连续 {max_failed_frames} 帧读取失败，停止读取。已提取: {len(frames)} 帧"
-                            )
-                            break
-                        
-                        # 尝试跳转到下一帧
-                        cap.set(cv2.CAP_PROP_POS_FRAMES, i + 1)
-                        continue
-                    
-                    # 验证帧数据
-                    if frame.size == 0:
-                        consecutive_failures += 1
-                        failed_frames += 1
-                        continue
-                    
-                    # 重置连续失败计数
-                    consecutive_failures = 0
-                    
-                    # 收集有效帧
-                    frames.append(frame.copy())
-
-                    # 更新UI进度（每10帧更新一次，减少UI更新开销）
-                    if i % 10 == 0 or i == total_frames - 1:
-                        progress = (i + 1) / total_frames
-                        status_text = f"读取中: {i+1}/{total_frames} 帧 | 已提取: {len(frames)} 帧"
-                        if failed_frames > 0:
-                            status_text += f" | 跳过: {failed_frames} 帧"
-                        status_callback(progress, status_text)
-                
-                except Exception as e:
-                    # 捕获单个帧读取的错误，继续处理
-                    failed_frames += 1
-                    consecutive_failures += 1
-                    
-                    if consecutive_failures >= max_failed_frames:
-                        status_callback(
-                            (i + 1) / total_frames,
-                            f"错误: 连续 {max_failed_frames} 帧读取失败 ({str(e)})，停止读取。已提取: {len(frames)} 帧"
-                        )
-                        break
-                    
-                    # 尝试跳转到下一帧
-                    try:
-                        cap.set(cv2.CAP_PROP_POS_FRAMES, i + 1)
-                    except:
-                        pass
-                    continue
+            backend_name = 'PyAV' if container is not None else 'OpenCV'
+            backend_name += f" (硬件: {hw_device})" if hw_device else " (软件)"
+            status_callback(0.0, f"视频信息: {width}x{height}, {fps:.2f} FPS, 总帧数: {total_frames} | 解码: {backend_name}")
 
+            frames = None
+            if (container is not None and self.parallel
+                    and os.path.getsize(video_path) >= PARALLEL_DECODE_MIN_BYTES):
+                frames = self._decode_parallel(video_path, total_frames, width, height, status_callback)
+                failed_frames = 0
+                if frames is None:
+                    status_callback(0.0, "并行解码未能完整提取所有帧，改用顺序解码")
+            if frames is None:
+                frames, failed_frames = self._decode_sequential(cap, container, stream, total_frames, width, height, status_callback)
+            
             # 检查是否提取到足够的帧
             if len(frames) == 0:
                 raise ValueError("未能提取任何有效帧，视频文件可能损坏或格式不支持")
@@ -136,3 +684,8 @@ class VideoProcessor:
                     cap.release()
                 except:
                     pass
+            if container is not None:
+                try:
+                    container.close()
+                except:
+                    pass
@@ -0,0 +1,78 @@
+import io
+import os
+import sys
+
+import numpy as np
+import pytest
+
+# 将 Backend 目录添加到路径
+current_dir = os.path.dirname(os.path.abspath(__file__))
+backend_path = os.path.join(current_dir, 'Backend')
+if backend_path not in sys.path:
+    sys.path.insert(0, backend_path)
+
+from WindVibAnalysis.main_workflow import _stored_npz_member_view, iter_frames_from_npz
+
+
+def _frames(n=7, h=6, w=5):
+    rng = np.random.default_rng(n)
+    return rng.integers(0, 256, size=(n, h, w, 3), dtype=np.uint8)
+
+
+def _write_npz(target, frames, fps, compressed):
+    save = np.savez_compressed if compressed else np.savez
+    # fps 写在 frames 之前，frames.npy 成员的本地文件头不在文件开头，偏移计算必须正确
+    save(target, fps=np.array([fps]), frames=frames)
+
+
+@pytest.mark.parametrize("compressed", [False, True], ids=["stored", "deflated"])
+@pytest.mark.parametrize("source", ["path", "bytesio"])
+def test_iter_frames_round_trip(tmp_path, compressed, source):
+    frames = _frames()
+    if source == "path":
+        npz = str(tmp_path / "frames.npz")
+        _write_npz(npz, frames, 30, compressed)
+    else:
+        npz = io.BytesIO()
+        _write_npz(npz, frames, 30, compressed)
+        npz.seek(5)  # 调用方留下的任意读写位置
+
+    # 未压缩的成员走零拷贝视图，压缩成员回退到逐帧流式读取
+    view = _stored_npz_member_view(npz, 'frames.npy')
+    assert (view is not None) == (not compressed)
+
+    frame_iter, n_frames, fps = iter_frames_from_npz(npz)
+    out = list(frame_iter)
+    assert (n_frames, fps) == (len(frames), 30)
+    assert len(out) == len(frames)
+    for got, expected in zip(out, frames):
+        assert got.dtype == np.uint8
+        np.testing.assert_array_equal(got, expected)
+
+
+@pytest.mark.parametrize("source", ["path", "bytesio"])
+def test_stored_view_is_read_only(tmp_path, source):
+    frames = _frames(n=3)
+    if source == "path":
+        npz = str(tmp_path / "frames.npz")
+    else:
+        npz = io.BytesIO()
+    _write_npz(npz, frames, 25, compressed=False)
+    view = _stored_npz_member_view(npz, 'frames.npy')
+    np.testing.assert_array_equal(view, frames)
+    with pytest.raises(ValueError):
+        view[0, 0, 0, 0] = 1
+
+
+def test_stored_view_rejects_object_frames(tmp_path):
+    # 旧格式的 object 数组不能直接映射，iter_frames_from_npz 回退到整体反序列化
+    frames = _frames(n=2)
+    obj = np.empty(2, dtype=object)
+    obj[0], obj[1] = frames[0], frames[1]
+    npz = str(tmp_path / "frames.npz")
+    np.savez(npz, frames=obj, fps=np.array([24]))
+    assert _stored_npz_member_view(npz, 'frames.npy') is None
+    frame_iter, n_frames, fps = iter_frames_from_npz(npz)
+    assert (n_frames, fps) == (2, 24)
+    for got, expected in zip(frame_iter, frames):
+        np.testing.assert_array_equal(got, expected)
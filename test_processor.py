@@ -0,0 +1,112 @@
+import os
+import sys
+
+import numpy as np
+import pytest
+
+# 将 Frontend 目录添加到路径
+current_dir = os.path.dirname(os.path.abspath(__file__))
+frontend_path = os.path.join(current_dir, 'Frontend')
+if frontend_path not in sys.path:
+    sys.path.insert(0, frontend_path)
+
+from processor import _FrameStore, _split_intervals
+
+
+def _synthetic_pts(n_frames, gop, step=512):
+    """
+    按解码顺序给出的包 pts（含 B 帧重排：每个 GOP 内 I 帧后紧跟 P 帧，再是 B 帧），以及关键帧 pts
+    """
+    pts_decode = []
+    keyframes = []
+    for g in range(0, n_frames, gop):
+        display = list(range(g, min(g + gop, n_frames)))
+        keyframes.append(display[0] * step)
+        order = [display[0]] + display[:0:-1] if len(display) > 1 else display
+        pts_decode.extend(i * step for i in order)
+    return pts_decode, keyframes
+
+
+@pytest.mark.parametrize("n_frames, gop, n_segments", [
+    (300, 30, 4),
+    (301, 25, 3),
+    (100, 100, 4),   # 只有一个关键帧：无法切分
+    (50, 7, 8),
+    (12, 1, 5),      # 全关键帧
+])
+def test_split_intervals_covers_every_frame_once(n_frames, gop, n_segments):
+    step = 512
+    pts_decode, keyframes = _synthetic_pts(n_frames, gop, step)
+    pts_sorted = sorted(pts_decode)
+    segments = _split_intervals(pts_sorted, sorted(keyframes), n_segments)
+
+    assert 1 <= len(segments) <= n_segments
+    assert segments[0][0] is None  # 第一个区间从头解码
+    next_index = 0
+    for start_pts, pts_index in segments:
+        indices = sorted(pts_index.values())
+        # 区间连续、首尾相接，且帧序号即 pts 在显示顺序中的位置
+        assert indices == list(range(next_index, next_index + len(indices)))
+        assert all(pts_sorted[i] == pts for pts, i in pts_index.items())
+        if start_pts is not None:
+            # 后续区间都从关键帧开始，且起点就是区间中的第一帧
+            assert start_pts in keyframes
+            assert pts_index[start_pts] == next_index
+        next_index += len(indices)
+    assert next_index == n_frames
+
+
+def test_split_intervals_bounds():
+    # 300 帧、每 30 帧一个关键帧，分 4 段：目标位置 75/150/225 之后的第一个关键帧为 90/150/240
+    pts_sorted = [i * 10 for i in range(300)]
+    keyframes = [i * 10 for i in range(0, 300, 30)]
+    segments = _split_intervals(pts_sorted, keyframes, 4)
+    assert [s for s, _ in segments] == [None, 900, 1500, 2400]
+    assert [len(m) for _, m in segments] == [90, 60, 90, 60]
+    assert segments[1][1][900] == 90 and segments[1][1][1490] == 149
+
+
+def test_frame_store_grows_and_shrinks():
+    store = _FrameStore(2, (4, 5, 3), np.uint8)
+    path = store.path
+    try:
+        frames = [np.full((4, 5, 3), i, dtype=np.uint8) for i in range(70)]
+        for i, frame in enumerate(frames):
+            if i % 2:
+                store.append(frame)
+            else:
+                store.slot()[...] = frame  # 解码器直接写入下一行
+                store.commit()
+        out = store.finish()
+        assert out.shape == (70, 4, 5, 3)
+        assert out.filename == os.path.abspath(path)
+        for i in range(70):
+            assert (out[i] == i).all()
+        assert os.path.getsize(path) == 70 * 4 * 5 * 3
+        del out
+    finally:
+        store.discard()
+    assert not os.path.exists(path)
+
+
+def test_frame_store_reset_and_mismatch():
+    store = _FrameStore(3, (4, 5, 3), np.uint8)
+    try:
+        store.reset((2, 2, 3), np.uint8)
+        store.append(np.ones((2, 2, 3), dtype=np.uint8))
+        with pytest.raises(ValueError):
+            store.append(np.ones((4, 5, 3), dtype=np.uint8))
+        with pytest.raises(ValueError):
+            store.reset((4, 5, 3), np.uint8)  # 已写入帧后不能更换格式
+        out = store.finish()
+        assert out.shape == (1, 2, 2, 3) and (out == 1).all()
+        del out
+    finally:
+        store.discard()
+
+
+def test_frame_store_empty_finish_removes_file():
+    store = _FrameStore(5, (4, 5, 3), np.uint8)
+    out = store.finish()
+    assert out.shape == (0, 4, 5, 3)
+    assert not os.path.exists(store.path)
@@ -0,0 +1,133 @@
+import os
+import sys
+
+import numpy as np
+import pytest
+from scipy import signal
+
+# 将 Backend 目录添加到路径
+current_dir = os.path.dirname(os.path.abspath(__file__))
+backend_path = os.path.join(current_dir, 'Backend')
+if backend_path not in sys.path:
+    sys.path.insert(0, backend_path)
+
+import signal_analysis as sa
+
+# Numba 内核与 NumPy 回退路径都要覆盖；未安装 numba 时只测回退路径
+NUMBA_PATHS = [False, True] if sa.NUMBA_AVAILABLE else [False]
+
+
+@pytest.fixture(params=NUMBA_PATHS, ids=lambda use: "numba" if use else "numpy")
+def numba_path(request, monkeypatch):
+    monkeypatch.setattr(sa, "NUMBA_AVAILABLE", request.param)
+    return request.param
+
+
+@pytest.mark.parametrize("n", [2, 3, 101, 4096])
+def test_linear_detrend_matches_scipy(numba_path, n):
+    rng = np.random.default_rng(n)
+    x = 3.0 + 0.02 * np.arange(n) + rng.normal(size=n)
+    np.testing.assert_allclose(sa._linear_detrend(x), signal.detrend(x, type="linear"), rtol=0, atol=1e-10)
+
+
+def _interp_baseline(x):
+    """原实现：无效值用 np.interp 按下标线性插值，首尾取最近的有效值"""
+    mask = np.isfinite(x)
+    idx = np.arange(x.size)
+    out = x.copy()
+    out[~mask] = np.interp(idx[~mask], idx[mask], x[mask])
+    return out
+
+
+@pytest.mark.parametrize("bad", [
+    [1],                # 单个内部空洞
+    [0, 1, 2],          # 开头的连续无效段
+    [97, 98, 99],       # 结尾的连续无效段
+    [10, 11, 12, 50, 70, 71],
+])
+def test_fill_nan_matches_interp(numba_path, bad):
+    rng = np.random.default_rng(0)
+    x = rng.normal(size=100)
+    x[bad] = np.nan
+    x[bad[-1]] = np.inf  # inf 与 NaN 同样视为无效值
+    expected = _interp_baseline(x)
+    x_before = x.copy()
+    np.testing.assert_allclose(sa._sanitize_signal(x), expected, rtol=0, atol=1e-12)
+    np.testing.assert_array_equal(x, x_before)  # 不修改输入
+    if numba_path:
+        np.testing.assert_allclose(sa._fill_nan_linear(x), expected, rtol=0, atol=1e-12)
+
+
+def test_fill_nan_all_invalid_raises(numba_path):
+    with pytest.raises(ValueError):
+        sa._sanitize_signal(np.array([np.nan, np.inf, np.nan]))
+
+
+def _band_peak_baseline(freqs, X_amp, fmin, fmax):
+    """原实现：布尔掩码取频段，argmax 取主峰（并列取低频一侧），排序取次峰，中位数为噪声底"""
+    band_mask = (freqs >= fmin) & (freqs <= fmax)
+    if not np.any(band_mask):
+        return None
+    f_band = freqs[band_mask]
+    X_band = X_amp[band_mask]
+    idx_local = int(np.argmax(X_band))
+    X_sorted = np.sort(X_band)
+    second = float(X_sorted[-2]) if X_sorted.size >= 2 else 0.0
+    return float(f_band[idx_local]), float(X_band[idx_local]), second, float(np.median(X_band))
+
+
+@pytest.mark.parametrize("fmin, fmax", [
+    (0.5, 4.0),
+    (1.0, 1.0),     # 恰好一个频点
+    (1.01, 1.02),   # 频段内没有频点
+    (0.01, 15.0),   # 覆盖全部频点
+])
+@pytest.mark.parametrize("quantized", [False, True])
+def test_band_peak_stats_matches_baseline(numba_path, fmin, fmax, quantized):
+    rng = np.random.default_rng(1)
+    freqs = np.fft.rfftfreq(600, d=1.0 / 30)
+    X_amp = rng.random(freqs.size)
+    if quantized:
+        # 少量离散取值，制造大量并列的峰值与次峰
+        X_amp = np.round(X_amp * 4) / 4
+    expected = _band_peak_baseline(freqs, X_amp, fmin, fmax)
+    actual = sa._band_peak_stats(freqs, X_amp, fmin, fmax)
+    if expected is None:
+        assert actual is None
+    else:
+        assert actual == pytest.approx(expected, rel=0, abs=1e-12)
+
+
+def _series(fan_id, fs, n, f0, seed, nan_at=()):
+    rng = np.random.default_rng(seed)
+    t = np.arange(n) / fs
+    x = 2.0 * np.sin(2 * np.pi * f0 * t) + 0.5 * np.sin(2 * np.pi * 2.1 * t) + 0.01 * t + 0.1 * rng.normal(size=n)
+    x[list(nan_at)] = np.nan
+    return sa.DisplacementSeries(time_stamps=t, d_t_mm=x, fs=fs, fan_id=fan_id)
+
+
+@pytest.mark.parametrize("zero_phase", [True, False])
+def test_analyze_many_matches_single(zero_phase):
+    # 同一 (fs, N) 的三条信号走批量路径，另外两条各自单独成组
+    series_list = [
+        _series("a", 30, 900, 0.37, 0),
+        _series("b", 30, 900, 0.52, 1, nan_at=(5, 6, 400)),
+        _series("c", 30, 900, 0.81, 2),
+        _series("d", 30, 600, 0.45, 3),
+        _series("e", 60, 900, 0.45, 4),
+    ]
+    params = dict(low_cut=0.2, high_cut=5.0, A_pp_limit=3.0, zero_phase=zero_phase)
+
+    batched = sa.analyze_many(series_list, **params)
+    assert len(batched) == len(series_list)
+    for series, res in zip(series_list, batched):
+        ref = sa.analyze_displacement_series(series, **params)
+        assert res.fan_id == ref.fan_id
+        assert res.f_dominant_hz == pytest.approx(ref.f_dominant_hz, rel=1e-12)
+        assert res.A_pp_mm == pytest.approx(ref.A_pp_mm, rel=1e-9)
+        assert res.A_rms_mm == pytest.approx(ref.A_rms_mm, rel=1e-9)
+        assert res.is_abnormal == ref.is_abnormal
+        np.testing.assert_allclose(res.f_spectrum, ref.f_spectrum, rtol=1e-12)
+        np.testing.assert_allclose(res.X_spectrum, ref.X_spectrum, rtol=1e-9, atol=1e-12)
+        for key in ("peak_amp", "second_peak_amp", "peak_ratio", "snr_db"):
+            assert res.quality[key] == pytest.approx(ref.quality[key], rel=1e-9), key
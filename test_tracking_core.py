@@ -0,0 +1,104 @@
+import os
+import sys
+from dataclasses import replace
+
+import cv2
+import numpy as np
+import pytest
+
+# 将 WindVibAnalysis 目录添加到路径（模块内部使用 data_structs / image_analysis 顶层导入）
+current_dir = os.path.dirname(os.path.abspath(__file__))
+package_path = os.path.join(current_dir, 'Backend', 'WindVibAnalysis')
+if package_path not in sys.path:
+    sys.path.insert(0, package_path)
+
+from data_structs.analysis_data import TrackingConfig
+from image_analysis import tracking_core
+from image_analysis.tracking_core import MarkerTracker, generate_pixel_series
+
+
+def _marker_frames(n_frames, distractor_frames=(), size=(120, 160)):
+    """
+    红色圆形标记做正弦振动的合成帧序列；distractor_frames 中的帧在画面另一侧额外出现一个更大的红色区域
+    """
+    h, w = size
+    frames = []
+    for i in range(n_frames):
+        frame = np.full((h, w, 3), 40, dtype=np.uint8)
+        cx = 50 + 6.0 * np.sin(i / 4.0)
+        cv2.circle(frame, (int(round(cx * 16)), 60 * 16), 8 * 16, (0, 0, 255), -1, cv2.LINE_AA, shift=4)
+        if i in distractor_frames:
+            cv2.rectangle(frame, (120, 20), (150, 100), (0, 0, 255), -1)
+        frames.append(frame)
+    return frames
+
+
+def test_local_tracking_is_off_by_default():
+    assert TrackingConfig().local_tracking is False
+
+
+def test_sequential_path_does_not_use_process_cache():
+    # 进程内跟踪每次调用新建跟踪器，_get_tracker 的进程级缓存只供工作进程使用
+    tracking_core._get_tracker.cache_clear()
+    generate_pixel_series(_marker_frames(10), TrackingConfig(), n_jobs=1)
+    assert tracking_core._get_tracker.cache_info().currsize == 0
+
+
+@pytest.mark.parametrize("local_tracking", [False, True])
+def test_parallel_matches_sequential(monkeypatch, local_tracking):
+    # 缩小分段与并行门槛，使短序列也走多进程路径并跨越多个分段；
+    # 干扰区域跨过第 32 帧的分段边界，局部跟踪的跨帧状态若与分段方式有关，结果就会不同
+    monkeypatch.setattr(tracking_core, "TRACK_CHUNK_FRAMES", 32)
+    monkeypatch.setattr(tracking_core, "PARALLEL_MIN_FRAMES", 0)
+    frames = _marker_frames(120, distractor_frames=range(20, 50))
+    config = replace(TrackingConfig(), local_tracking=local_tracking)
+
+    dx_seq, dy_seq = generate_pixel_series(frames, config, n_jobs=1)
+    for n_jobs in (2, 3):
+        dx_par, dy_par = generate_pixel_series(frames, config, n_jobs=n_jobs)
+        np.testing.assert_array_equal(dx_par, dx_seq)
+        np.testing.assert_array_equal(dy_par, dy_seq)
+
+
+def test_pyramid_roi_matches_full_resolution():
+    # 抗锯齿椭圆标记的边缘像素接近阈值，ROI 余量不足时裁剪边界会改变形态学结果并使质心偏移
+    rng = np.random.default_rng(0)
+    full = MarkerTracker(replace(TrackingConfig(), detect_pyr_levels=0))
+    pyr = MarkerTracker(replace(TrackingConfig(), detect_pyr_levels=1))
+    compared = 0
+    for _ in range(300):
+        frame = np.full((240, 320, 3), 40, dtype=np.uint8)
+        center = (int(rng.uniform(40, 280) * 16), int(rng.uniform(40, 200) * 16))
+        axes = (int(rng.uniform(4, 20) * 16), int(rng.uniform(3, 12) * 16))
+        cv2.ellipse(frame, center, axes, rng.uniform(0, 180), 0, 360, (0, 0, 255), -1, cv2.LINE_AA, shift=4)
+        m_full = full.track_marker_moments(frame)
+        m_pyr = pyr.track_marker_moments(frame)
+        if np.isnan(m_pyr[0]):
+            # 降采样后的形态学可能滤掉很小的标记，这正是 detect_pyr_levels 默认为 0 的原因
+            continue
+        compared += 1
+        assert m_pyr[0] == m_full[0]
+        np.testing.assert_allclose(m_pyr[1] / m_pyr[0], m_full[1] / m_full[0], atol=1e-9)
+        np.testing.assert_allclose(m_pyr[2] / m_pyr[0], m_full[2] / m_full[0], atol=1e-9)
+    assert compared > 200
+
+
+def test_numba_matches_opencv_on_single_marker():
+    pytest.importorskip("numba")
+    # Numba 路径对全部红色像素取矩，画面中只有一个标记时应与 OpenCV 最大轮廓的质心一致
+    frames = _marker_frames(20)
+    cv_tracker = MarkerTracker(replace(TrackingConfig(), use_numba=False))
+    nb_tracker = MarkerTracker(replace(TrackingConfig(), use_numba=True))
+    assert nb_tracker.use_numba
+    for frame in frames:
+        m_cv = cv_tracker.track_marker_moments(frame)
+        m_nb = nb_tracker.track_marker_moments(frame)
+        # 轮廓多边形与像素计数对抗锯齿边缘的取舍不同（实测相差约 0.1 像素），只比较质心
+        np.testing.assert_allclose(m_nb[1] / m_nb[0], m_cv[1] / m_cv[0], atol=0.25)
+        np.testing.assert_allclose(m_nb[2] / m_nb[0], m_cv[2] / m_cv[0], atol=0.25)
+
+    # 出现第二个红色区域时 Numba 路径把两者合并成一个质心，OpenCV 路径只取最大轮廓
+    frame = _marker_frames(1, distractor_frames=(0,))[0]
+    m_cv = MarkerTracker(TrackingConfig()).track_marker_moments(frame)
+    m_nb = MarkerTracker(replace(TrackingConfig(), use_numba=True)).track_marker_moments(frame)
+    assert abs(m_nb[1] / m_nb[0] - m_cv[1] / m_cv[0]) > 5